@@ -1,8 +1,7 @@
 import numpy as np
 import sounddevice as sd
-import queue
+import threading
 import time
-from datetime import datetime, timezone
 
 MORSE_CODE_REVERSED = {
     '.-': 'A', '-...': 'B', '-.-.': 'C', '-..': 'D', '.': 'E',
@@ -16,82 +15,122 @@ MORSE_CODE_REVERSED = {
     '.-.-.-': '.', '-....-': '-', '..--.-': '_', '/': ' ', '': ''
 }
 
+# Same table keyed and valued by bytes, so the decoder's bytearray
+# buffers can be looked up and extended without a str round trip
+MORSE_BYTES_REVERSED = {k.encode(): v.encode() for k, v in MORSE_CODE_REVERSED.items()}
+
 samplerate = 44100
 threshold = 0.05
 dot_duration = 0.12
-q = queue.Queue()
+blocksize = 1024
+
+# Single-producer/single-consumer ring between the audio callback and the
+# decoder. write_pos counts every sample written; only the callback moves it.
+RING_SIZE = 1 << 16  # ~1.5 s, a whole number of blocks
+ring = np.zeros(RING_SIZE, dtype=np.float32)
+write_pos = 0
+data_ready = threading.Event()
+
+def rms2(d):
+    """Mean square of a block (RMS squared) via a single dot product."""
+    return (d @ d) / d.size
+
+def utc_timestamp():
+    """Current UTC time as ISO 8601 to the second, e.g. 2025-01-31T00:00:00+00:00."""
+    tm = time.gmtime()
+    return (f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+            f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}+00:00")
 
 def audio_callback(indata, frames, time, status):
-    q.put(indata.copy())
+    # Plain copy into the ring: no allocation, no lock on the audio thread
+    global write_pos
+    start = write_pos % RING_SIZE
+    end = start + frames
+    if end <= RING_SIZE:
+        ring[start:end] = indata[:, 0]
+    else:
+        split = RING_SIZE - start
+        ring[start:] = indata[:split, 0]
+        ring[:end - RING_SIZE] = indata[split:, 0]
+    write_pos += frames
+    data_ready.set()
 
 def listen_and_decode():
-    current_symbol = ''
-    message_buffer = ''
+    # Growable byte buffers; decoded to str only when printed or processed
+    current_symbol = bytearray()
+    message_buffer = bytearray()
     last_activity = time.time()
     in_signal = False
     receiving_message = False
     last_print_len = 0  # Track previous message length
+    read_pos = 0  # Decoder position in the ring
 
-    with sd.InputStream(callback=audio_callback, channels=1, samplerate=samplerate):
+    with sd.InputStream(callback=audio_callback, channels=1, samplerate=samplerate,
+                        blocksize=blocksize):
         print("Listening for sensor data...")
         while True:
             # Message completion check (2 seconds of silence)
             if receiving_message and (time.time() - last_activity) > 2:
-                process_message(message_buffer)
-                message_buffer = ''
-                current_symbol = ''
+                process_message(message_buffer.decode())
+                message_buffer.clear()
+                current_symbol.clear()
                 receiving_message = False
                 print("\nReady for new transmission...")
 
-            try:
-                data = q.get_nowait().flatten()
-                rms = np.sqrt(np.mean(np.square(data)))
+            if write_pos - read_pos < blocksize:
+                data_ready.wait(0.01)
+                data_ready.clear()
+                continue
+            if write_pos - read_pos > RING_SIZE:
+                # Decoder fell a whole ring behind; drop to recent audio
+                read_pos = write_pos - RING_SIZE // 2
+                read_pos -= read_pos % blocksize
+            start = read_pos % RING_SIZE
+            data = ring[start:start + blocksize]
+            read_pos += blocksize
+            loud = rms2(data) > threshold * threshold
                 
-                if rms > threshold and not in_signal:
-                    in_signal = True
-                    signal_start = time.time()
-                    last_activity = signal_start
+            if loud and not in_signal:
+                in_signal = True
+                signal_start = time.time()
+                last_activity = signal_start
                     
-                    # Detect message start
-                    if not receiving_message:
-                        receiving_message = True
-                        message_buffer = ''
+                # Detect message start
+                if not receiving_message:
+                    receiving_message = True
+                    message_buffer.clear()
                         
-                elif rms <= threshold and in_signal:
-                    in_signal = False
-                    signal_duration = time.time() - signal_start
-                    last_activity = time.time()
+            elif not loud and in_signal:
+                in_signal = False
+                signal_duration = time.time() - signal_start
+                last_activity = time.time()
                     
-                    # Symbol detection
-                    if signal_duration < 1.5*dot_duration:
-                        current_symbol += '.'
-                    else:
-                        current_symbol += '-'
+                # Symbol detection
+                if signal_duration < 1.5*dot_duration:
+                    current_symbol.append(46)  # '.'
+                else:
+                    current_symbol.append(45)  # '-'
                         
-                # Character/word space detection
-                if not in_signal:
-                    silence_duration = time.time() - last_activity
+            # Character/word space detection
+            if not in_signal:
+                silence_duration = time.time() - last_activity
                     
-                    # Word space handling
-                    if silence_duration > 7*dot_duration and message_buffer:
-                        message_buffer += ' '
-                        # Clear previous line completely
-                        print(' ' * last_print_len, end='\r')
-                        print(f"Receiving: {message_buffer}", end='\r')
-                        last_print_len = len(message_buffer) + 10
+                # Word space handling
+                if silence_duration > 7*dot_duration and message_buffer:
+                    message_buffer.append(32)  # ' '
+                    # Clear previous line completely
+                    print(' ' * last_print_len, end='\r')
+                    print(f"Receiving: {message_buffer.decode()}", end='\r')
+                    last_print_len = len(message_buffer) + 10
                     
-                    # Character space handling
-                    elif silence_duration > 3*dot_duration and current_symbol:
-                        char = MORSE_CODE_REVERSED.get(current_symbol, '')
-                        message_buffer += char
-                        current_symbol = ''
-                        # Clear previous line completely
-                        print(' ' * last_print_len, end='\r')
-                        print(f"Receiving: {message_buffer}", end='\r')
-                        last_print_len = len(message_buffer) + 10
-
-            except queue.Empty:
-                time.sleep(0.01)
+                # Character space handling
+                elif silence_duration > 3*dot_duration and current_symbol:
+                    message_buffer += MORSE_BYTES_REVERSED.get(bytes(current_symbol), b'')
+                    current_symbol.clear()
+                    # Clear previous line completely
+                    print(' ' * last_print_len, end='\r')
+                    print(f"Receiving: {message_buffer.decode()}", end='\r')
+                    last_print_len = len(message_buffer) + 10
 
 def process_message(raw_message):
     print(' ' * 100, end='\r')
@@ -112,7 +151,7 @@ def process_message(raw_message):
             print(f"\nInvalid format: {clean} (got {len(payload)}/7 values)")
             return
         
-        recorded_at = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+        recorded_at = utc_timestamp()
 
         print(f"\n\n=== Sensor Data=======")
         print(f"device_id: {payload[0]}")
@@ -3,8 +3,8 @@ import datetime
 import os
 import random
 import time
-import numpy as np
 import sounddevice as sd
+from combinedsender import MorseSender
 
 PROGRESS_FILE = "progress.json"
 PREVIOUS_READINGS_FILE = "previous_readings.json"
@@ -21,31 +21,7 @@ MORSE_CODE_DICT = {
 FREQUENCY = 600
 dot_duration = 0.1
 
-def text_to_morse(text):
-    return ' '.join(MORSE_CODE_DICT.get(i, '') for i in text)
-
-def generate_tone(duration):
-    t = np.linspace(0, duration, int(44100 * duration), False)
-    return 0.5 * np.sin(2 * np.pi * FREQUENCY * t)
-
-def play_morse(morse_code):
-    primer = '... / '
-    morse_code = primer + morse_code + ' /'
-    
-    for symbol in morse_code:
-        if symbol == '.':
-            sd.play(generate_tone(dot_duration), samplerate=44100)
-            sd.wait()
-            time.sleep(dot_duration)  # Inter-symbol space
-        elif symbol == '-':
-            sd.play(generate_tone(3*dot_duration), samplerate=44100)
-            sd.wait()
-            time.sleep(dot_duration)  # Inter-symbol space
-        elif symbol == ' ':
-            time.sleep(3*dot_duration)  # Inter-character space
-        elif symbol == '/':
-            time.sleep(7*dot_duration)  # Inter-word space
-
+morse_sender = MorseSender(dot_duration, FREQUENCY, MORSE_CODE_DICT)
 
 def load_previous_readings():
     if os.path.exists(PREVIOUS_READINGS_FILE):
@@ -129,7 +105,7 @@ def generate_reading(device_id, previous_readings, timestamp):
         "pm10_ug_m3": float(pm10)
     }
 
-def handle_reading(timestamp, device_id, previous_readings):
+def handle_reading(timestamp, device_id, previous_readings, stream):
     reading = generate_reading(device_id, previous_readings, timestamp)
     
     # Create transmission message (device number + sensor values)
@@ -145,7 +121,7 @@ def handle_reading(timestamp, device_id, previous_readings):
     message = ' '.join(values)
     
     print(f"Transmitting: {message}")
-    play_morse(text_to_morse(message))
+    morse_sender.play(morse_sender.text_to_morse(message), stream)
 
 def main():
     last_timestamp = load_progress()
@@ -158,24 +134,25 @@ def main():
         next_transmission = datetime.datetime.now(datetime.timezone.utc)
 
     try:
-        while True:
-            # Calculate sleep duration
-            now = datetime.datetime.now(datetime.timezone.utc)
-            sleep_seconds = (next_transmission - now).total_seconds()
+        with sd.OutputStream(samplerate=44100, channels=1, dtype='float32') as stream:
+            while True:
+                # Calculate sleep duration
+                now = datetime.datetime.now(datetime.timezone.utc)
+                sleep_seconds = (next_transmission - now).total_seconds()
             
-            if sleep_seconds > 0:
-                print(f"Next transmission at {next_transmission.isoformat()}")
-                time.sleep(sleep_seconds)
-
-            # Generate and transmit reading
-            transmission_time = datetime.datetime.now(datetime.timezone.utc)
-            for device_id in device_ids:
-                handle_reading(transmission_time, device_id, previous_readings)
-
-            # Update and save progress
-            next_transmission = transmission_time + datetime.timedelta(minutes=3)
-            save_progress(transmission_time.isoformat())
-            save_previous_readings(previous_readings)
+                if sleep_seconds > 0:
+                    print(f"Next transmission at {next_transmission.isoformat()}")
+                    time.sleep(sleep_seconds)
+
+                # Generate and transmit reading
+                transmission_time = datetime.datetime.now(datetime.timezone.utc)
+                for device_id in device_ids:
+                    handle_reading(transmission_time, device_id, previous_readings, stream)
+
+                # Update and save progress
+                next_transmission = transmission_time + datetime.timedelta(minutes=3)
+                save_progress(transmission_time.isoformat())
+                save_previous_readings(previous_readings)
 
     except KeyboardInterrupt:
         print("\nInterrupted. Saving progress before exiting...")
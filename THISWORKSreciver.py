@@ -1,3 +1,4 @@
+import math
 import numpy as np
 import sounddevice as sd
 import queue
@@ -20,7 +21,7 @@ dot_duration = 0.1
 q = queue.Queue()
 
 def audio_callback(indata, frames, time, status):
-    q.put(indata.copy())
+    q.put(indata[:, 0].copy())  # mono samples, already 1-D
 
 def listen_and_decode():
     current_symbol = ''
@@ -28,12 +29,14 @@ def listen_and_decode():
     last_time = time.time()
     in_signal = False
 
-    with sd.InputStream(callback=audio_callback, channels=1, samplerate=samplerate, blocksize=1024):
+    with sd.InputStream(callback=audio_callback, channels=1, samplerate=samplerate, blocksize=1024,
+                        dtype='float32'):
         print("Listening for Morse code...")
         while True:
             try:
-                data = q.get_nowait().flatten()
-                rms = np.sqrt(np.mean(np.square(data)))
+                data = q.get(timeout=0.1)
+                # One float32 dot product instead of square/mean temporaries
+                rms = math.sqrt(float(np.dot(data, data)) / data.size)
                 
                 if rms > threshold and not in_signal:
                     # Signal started
@@ -66,7 +69,7 @@ def listen_and_decode():
                         print(f"\rCurrent message: {message}", end='')
 
             except queue.Empty:
-                time.sleep(0.01)
+                continue  # Woken by the next block, no fixed poll
 
 if __name__ == "__main__":
     listen_and_decode()
\ No newline at end of file
@@ -18,11 +18,18 @@ MORSE_CODE_DICT = {
 frequency = 600  # Hz
 dot_duration = 0.1  # Seconds
 
+# Morse for every ASCII code point (either case), '' if not sendable
+MORSE_LUT = tuple(MORSE_CODE_DICT.get(chr(c).upper(), '') for c in range(128))
+
 def text_to_morse(text):
-    return ' '.join(MORSE_CODE_DICT.get(i.upper(), '') for i in text)
+    return ' '.join([MORSE_LUT[c] if c < 128 else '' for c in map(ord, text)])
 def generate_tone(duration):
-    t = np.linspace(0, duration, int(44100 * duration), False)
-    return 0.5 * np.sin(2 * np.pi * frequency * t)
+    # float32 and in place: one buffer, no float64 temporaries
+    t = np.arange(int(44100 * duration), dtype=np.float32)
+    t *= np.float32(2 * np.pi * frequency / 44100)
+    np.sin(t, out=t)
+    t *= np.float32(0.5)
+    return t
 
 def play_morse(morse_code):
     primer = '... / '
@@ -7,7 +7,6 @@ import numpy as np
 import pyaudio
 import time
 import argparse
-from scipy.signal import butter, lfilter
 import threading
 
 # AFSK parameters - must match transmitter
@@ -19,133 +18,164 @@ SAMPLE_RATE = 44100 # Hz
 # Detection parameters
 NOISE_THRESHOLD = 0.01  # Threshold for signal detection
 MIN_SIGNAL_DURATION = 0.5  # Minimum duration (seconds) for valid signal
+BUFFER_SECONDS = 30  # Initial capacity of the signal buffer (grows if needed)
+RING_SIZE = 2**20  # Samples held between the audio callback and the worker (~24 s)
 
 # Create audio object
 p = pyaudio.PyAudio()
 
-def bandpass_filter(data, center_freq, bandwidth=100):
-    """Apply a bandpass filter around the target frequency"""
-    nyquist = 0.5 * SAMPLE_RATE
-    low = (center_freq - bandwidth/2) / nyquist
-    high = (center_freq + bandwidth/2) / nyquist
-    
-    # Create a butterworth filter
-    b, a = butter(3, [low, high], btype='band')
-    
-    # Apply the filter
-    return lfilter(b, a, data)
+# Samples in one bit period
+SAMPLES_PER_BIT = int(SAMPLE_RATE / BAUD_RATE)
+
+# Single-bin DFT basis for MARK and SPACE over one bit period, as real
+# float32 columns (cos, sin for MARK, then for SPACE), shape (spb, 4).
+# Multiplying bit windows by this is the Goertzel result for both tones at
+# once, and keeps float32 input on a float32 matmul with no complex upcast.
+_n = np.arange(SAMPLES_PER_BIT)
+_angles = 2 * np.pi * np.outer(_n, [MARK_FREQ, SPACE_FREQ]) / SAMPLE_RATE
+TONE_BASIS = np.column_stack([np.cos(_angles[:, 0]), np.sin(_angles[:, 0]),
+                              np.cos(_angles[:, 1]), np.sin(_angles[:, 1])]).astype(np.float32)
+
+def tone_powers(audio_buffer):
+    """
+    MARK and SPACE power for every whole bit period in the buffer.
+    Returns an array of shape (num_bits, 2), scaled so a full-scale tone
+    reads the same as its mean square (A^2 / 2).
+    """
+    num_bits = len(audio_buffer) // SAMPLES_PER_BIT
+    frames = np.asarray(audio_buffer[:num_bits * SAMPLES_PER_BIT], dtype=np.float32)
+    frames = frames.reshape(num_bits, SAMPLES_PER_BIT)
+    proj = frames @ TONE_BASIS
+    proj *= proj
+    return proj.reshape(num_bits, 2, 2).sum(axis=2) * (2.0 / SAMPLES_PER_BIT ** 2)
+
+# Run the kernel once at import so BLAS setup isn't paid on the first chunk
+tone_powers(np.zeros(SAMPLES_PER_BIT, dtype=np.float32))
 
 def detect_signal(audio_buffer):
     """Detect if a valid signal is present in the audio buffer"""
     # Look for energy in either MARK or SPACE frequencies
-    mark_filtered = bandpass_filter(audio_buffer, MARK_FREQ)
-    space_filtered = bandpass_filter(audio_buffer, SPACE_FREQ)
-    
-    # Calculate signal energy
-    mark_energy = np.mean(mark_filtered ** 2)
-    space_energy = np.mean(space_filtered ** 2)
-    total_energy = mark_energy + space_energy
+    powers = tone_powers(audio_buffer)
+    if len(powers) == 0:
+        return False
     
     # Check if above threshold
+    total_energy = powers.sum(axis=1).mean()
     return total_energy > NOISE_THRESHOLD
 
 def decode_afsk(audio_buffer):
-    """Decode AFSK signal to binary data"""
-    # Calculate samples per bit
-    samples_per_bit = int(SAMPLE_RATE / BAUD_RATE)
-    
-    # Filter signal for MARK and SPACE frequencies
-    mark_filtered = bandpass_filter(audio_buffer, MARK_FREQ)
-    space_filtered = bandpass_filter(audio_buffer, SPACE_FREQ)
-    
-    # Calculate energy for each bit period
-    num_bits = len(audio_buffer) // samples_per_bit
-    binary_data = ""
-    
-    for i in range(num_bits):
-        start = i * samples_per_bit
-        end = start + samples_per_bit
-        
-        # Calculate energy in each frequency band
-        mark_energy = np.sum(mark_filtered[start:end] ** 2)
-        space_energy = np.sum(space_filtered[start:end] ** 2)
-        
-        # Determine bit value based on which frequency has more energy
-        if mark_energy > space_energy:
-            binary_data += "1"
-        else:
-            binary_data += "0"
-    
-    return binary_data
+    """Decode AFSK signal to a uint8 array of bits (1 = MARK)"""
+    # MARK vs SPACE power for each bit period in one pass
+    powers = tone_powers(audio_buffer)
+    return (powers[:, 0] > powers[:, 1]).astype(np.uint8)
 
 def binary_to_text(binary_data):
-    """Convert binary string to text"""
+    """Convert an array of bits (MSB first) to text"""
     # Ensure binary data length is a multiple of 8
-    binary_data = binary_data[:len(binary_data) - (len(binary_data) % 8)]
+    bits = np.asarray(binary_data, dtype=np.uint8)
+    bits = bits[:len(bits) - (len(bits) % 8)]
     
-    # Convert each 8-bit group to a character
-    text = ""
-    for i in range(0, len(binary_data), 8):
-        byte = binary_data[i:i+8]
-        try:
-            text += chr(int(byte, 2))
-        except ValueError:
-            text += "?"
-    
-    return text
+    # Pack each 8-bit group into a byte; latin-1 maps every byte to one character
+    return np.packbits(bits).tobytes().decode('latin-1')
 
 def receive_audio():
     """Main function to receive and process audio"""
     CHUNK = 4410  # 0.1 seconds of audio at 44.1kHz
     
-    # Create a buffer for audio data
-    audio_buffer = []
+    # Create a buffer for audio data, filled up to buffer_len
+    audio_buffer = np.empty(SAMPLE_RATE * BUFFER_SECONDS, dtype=np.float32)
+    buffer_len = 0
     in_signal = False
-    signal_start_time = 0
     
-    # Set up audio callback function
+    # Ring buffer between the audio callback and the worker thread. Positions
+    # are running sample counts; only the callback advances write_pos and
+    # only the worker advances read_pos.
+    ring = np.empty(RING_SIZE, dtype=np.float32)
+    write_pos = 0
+    read_pos = 0
+    data_ready = threading.Event()
+    stop_worker = threading.Event()
+    
+    # Set up audio callback function - only copies samples into the ring
     def audio_callback(in_data, frame_count, time_info, status):
-        # Convert audio data to numpy array
-        data = np.frombuffer(in_data, dtype=np.int16).astype(np.float32) / 32768.0
+        nonlocal write_pos
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        start = write_pos % RING_SIZE
+        first = min(len(samples), RING_SIZE - start)
         
-        # Process data
-        process_audio(data)
+        # Convert straight into the ring, wrapping at the end if needed
+        np.multiply(samples[:first], np.float32(1.0 / 32768.0),
+                    out=ring[start:start + first], casting='unsafe')
+        if first < len(samples):
+            np.multiply(samples[first:], np.float32(1.0 / 32768.0),
+                        out=ring[:len(samples) - first], casting='unsafe')
+        
+        write_pos += len(samples)
+        data_ready.set()
         
         return (in_data, pyaudio.paContinue)
     
+    # Worker thread: pull CHUNK-sized frames from the ring and process them
+    def process_ring():
+        nonlocal read_pos
+        while not stop_worker.is_set():
+            data_ready.wait(timeout=0.5)
+            data_ready.clear()
+            
+            if write_pos - read_pos > RING_SIZE:
+                print("Warning: processing fell behind, audio dropped")
+                read_pos = write_pos - RING_SIZE
+            
+            while write_pos - read_pos >= CHUNK:
+                start = read_pos % RING_SIZE
+                end = start + CHUNK
+                if end <= RING_SIZE:
+                    data = ring[start:end]
+                else:
+                    data = np.concatenate((ring[start:], ring[:end - RING_SIZE]))
+                process_audio(data)
+                read_pos += CHUNK
+    
     # Function to process incoming audio
     def process_audio(data):
-        nonlocal audio_buffer, in_signal, signal_start_time
+        nonlocal audio_buffer, buffer_len, in_signal
         
         # Check if we have a signal
         if not in_signal:
             if detect_signal(data):
                 # Signal started
                 in_signal = True
-                signal_start_time = time.time()
-                audio_buffer = []  # Clear buffer
+                buffer_len = 0  # Clear buffer
                 print("Signal detected - receiving...")
         
         # If we're tracking a signal, add data to buffer
         if in_signal:
-            audio_buffer.extend(data)
+            end = buffer_len + len(data)
+            if end > len(audio_buffer):
+                # Out of room: double the capacity, keeping what we have
+                grown = np.empty(max(2 * len(audio_buffer), end), dtype=np.float32)
+                grown[:buffer_len] = audio_buffer[:buffer_len]
+                audio_buffer = grown
+            audio_buffer[buffer_len:end] = data
+            buffer_len = end
             
             # Check if signal is still present
             if not detect_signal(data):
                 # Signal may have ended
-                # Only process if signal was long enough
-                signal_duration = time.time() - signal_start_time
+                # Only process if signal was long enough (timed by samples,
+                # since the worker may be running behind the audio clock)
+                signal_duration = buffer_len / SAMPLE_RATE
                 
                 if signal_duration >= MIN_SIGNAL_DURATION:
                     print(f"Signal received: {signal_duration:.1f} seconds")
                     
-                    # Process in separate thread to not block audio
+                    # Decode in a separate thread so the worker keeps draining the ring
                     threading.Thread(target=process_signal, 
-                                    args=(np.array(audio_buffer),)).start()
+                                    args=(audio_buffer[:buffer_len].copy(),)).start()
                 
                 # Reset for next signal
                 in_signal = False
-                audio_buffer = []
+                buffer_len = 0
     
     # Function to process a complete signal
     def process_signal(signal_data):
@@ -189,6 +219,10 @@ def receive_audio():
         print(f"MARK: {MARK_FREQ} Hz, SPACE: {SPACE_FREQ} Hz, RATE: {BAUD_RATE} baud")
         print("Press Ctrl+C to stop")
         
+        # Start the worker before audio starts flowing
+        worker = threading.Thread(target=process_ring, daemon=True)
+        worker.start()
+        
         # Keep running until interrupted
         stream.start_stream()
         try:
@@ -199,6 +233,9 @@ def receive_audio():
         finally:
             stream.stop_stream()
             stream.close()
+            stop_worker.set()
+            data_ready.set()
+            worker.join(timeout=1.0)
             
     finally:
         p.terminate()
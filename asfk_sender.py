@@ -19,38 +19,28 @@ END_MARKER = '01010101' * 8    # Longer end marker
 
 def text_to_binary(text):
     """Convert text to binary string"""
-    binary = ''
-    for char in text:
-        binary += format(ord(char), '08b')
-    return binary
+    bits = np.unpackbits(np.frombuffer(text.encode('latin-1', errors='replace'), dtype=np.uint8))
+    return (bits + ord('0')).tobytes().decode('ascii')
 
 def binary_to_text(binary):
     """Convert binary string to text"""
-    text = ''
-    # Process in chunks of 8 bits (1 byte)
-    for i in range(0, len(binary), 8):
-        byte = binary[i:i+8]
-        if len(byte) == 8:  # Ensure we have a complete byte
-            text += chr(int(byte, 2))
-    return text
+    bits = np.frombuffer(binary.encode('ascii'), dtype=np.uint8) - ord('0')
+    # Only complete 8-bit groups (bytes) are converted
+    bits = bits[:len(bits) - len(bits) % 8]
+    return np.packbits(bits).tobytes().decode('latin-1')
+
+# Alternating 1/0 bits, starting with 1; built once since it never changes
+PREAMBLE = ('10' * ((PREAMBLE_BITS + 1) // 2))[:PREAMBLE_BITS]
 
 def generate_preamble():
     """Generate alternating bit sequence for VOX triggering and sync"""
-    preamble = ''
-    for i in range(PREAMBLE_BITS):
-        preamble += '1' if i % 2 == 0 else '0'
-    return preamble
+    return PREAMBLE
 
 def add_protocol_framing(binary_data):
     """Add protocol framing (preamble and markers) to binary data"""
     preamble = generate_preamble()
     return preamble + START_MARKER + binary_data + END_MARKER
 
-def calculate_phase_continuity(prev_phase, frequency, samples):
-    """Calculate phase to ensure continuity between tone transitions"""
-    angular_freq = 2 * np.pi * frequency / SAMPLE_RATE
-    return prev_phase + angular_freq * samples
-
 class AFSKTransmitter:
     def __init__(self, debug=False):
         self.sample_rate = SAMPLE_RATE
@@ -69,33 +59,26 @@ class AFSKTransmitter:
         # Add protocol framing (preamble + markers)
         framed_data = add_protocol_framing(binary_data)
         
-        # Create audio buffer
-        audio_buffer = np.zeros(len(framed_data) * self.bit_length, dtype=np.float32)
-        
         if self.debug:
             print(f"Generating AFSK signal for {len(framed_data)} bits ({len(framed_data)/8:.1f} bytes)")
             print(f"Total audio length: {len(framed_data) * self.bit_length / self.sample_rate:.2f}s")
         
-        # Generate tones for each bit with phase continuity
-        for i, bit in enumerate(framed_data):
-            start_idx = i * self.bit_length
-            end_idx = start_idx + self.bit_length
-            
-            # Select frequency based on bit value
-            freq = self.mark_freq if bit == '1' else self.space_freq
-            
-            # Generate time array for this bit
-            t = np.arange(self.bit_length)
-            
-            # Calculate the signal with phase continuity
-            self.phase = calculate_phase_continuity(self.phase, freq, self.bit_length)
-            
-            # Generate the tone with proper phase
-            audio_buffer[start_idx:end_idx] = np.sin(
-                2 * np.pi * freq * t / self.sample_rate + self.phase)
-            
-            # Debug output every 8 bits
-            if self.debug and i % 16 == 0 and i > 0:
+        # Per-sample frequency for the whole frame
+        bits = np.frombuffer(framed_data.encode('ascii'), dtype=np.uint8) == ord('1')
+        freqs = np.repeat(np.where(bits, self.mark_freq, self.space_freq), self.bit_length)
+        
+        # Integrate phase across all bits at once, carrying on from the previous
+        # transmission, so tone changes are continuous
+        step = 2 * np.pi * freqs / self.sample_rate
+        phase = self.phase + np.cumsum(step) - step
+        self.phase = (phase[-1] + step[-1]) % (2 * np.pi)
+        audio_buffer = np.sin(phase).astype(np.float32)
+        
+        # Debug output every 16 bits
+        if self.debug:
+            for i in range(16, len(framed_data), 16):
+                bit = framed_data[i]
+                freq = self.mark_freq if bit == '1' else self.space_freq
                 part = "PREAMBLE" if i < PREAMBLE_BITS else (
                       "START" if i < PREAMBLE_BITS + len(START_MARKER) else (
                       "END" if i >= PREAMBLE_BITS + len(START_MARKER) + len(binary_data) else "DATA"))
@@ -1,8 +1,8 @@
 import numpy as np
 import sounddevice as sd
-import queue
-import time
+import threading
 import json
+import re
 
 MORSE_CODE_REVERSED = {
     '.-': 'A', '-...': 'B', '-.-.': 'C', '-..': 'D', '.': 'E',
@@ -16,97 +16,179 @@ MORSE_CODE_REVERSED = {
     '--..--': ',', '.-.-.-': '.', '..--.-': '_', '-....-': '-'
 }
 
+# Integer-coded lookup: a symbol of n elements is (n << 6) | dash_bits,
+# dash_bits having bit i set when element i is a dash. Six bits of
+# pattern cover every symbol above, so the table has 7 rows of 64.
+# Every character is one ASCII byte, so the table is a bytes object and
+# decoded characters go straight into a bytearray.
+MAX_SYMBOL_LEN = 6
+
+def symbol_code(symbol):
+    code = len(symbol) << 6
+    for i, c in enumerate(symbol):
+        if c == '-':
+            code |= 1 << i
+    return code
+
+_table = ['?'] * ((MAX_SYMBOL_LEN + 1) << 6)
+for _symbol, _char in MORSE_CODE_REVERSED.items():
+    if _symbol and not _symbol.strip('.-'):
+        _table[symbol_code(_symbol)] = _char
+MORSE_TABLE = ''.join(_table).encode('ascii')
+UNKNOWN_CHAR = ord('?')
+del _table
+
 samplerate = 44100
 threshold = 0.03
+threshold_sq = threshold * threshold  # compare power, skip the sqrt
+tone_freq = 600  # Hz, must match the sender's FREQUENCY
 dot_duration = 0.1
-q = queue.Queue()
+dash_min = 1.5*dot_duration  # tone at least this long is a dash
+blocksize = 1024
+
+# Ring buffer filled by the audio callback. ring_head counts every sample
+# ever written; the decode loop keeps its own read position.
+RING_SIZE = 1 << 16  # ~1.5 s, a whole number of blocks
+ring = np.empty(RING_SIZE, dtype=np.float32)
+ring_head = 0
+data_ready = threading.Event()
+
+# Single-bin DFT (Goertzel) at the tone frequency over one block, as cos/sin
+# columns. Only energy at the carrier counts, not broadband noise.
+_phase = 2 * np.pi * tone_freq * np.arange(blocksize) / samplerate
+TONE_BASIS = np.stack([np.cos(_phase), np.sin(_phase)], axis=1).astype(np.float32)
+TONE_SCALE = np.float32(2.0 / blocksize**2)  # a tone of amplitude A reads A^2/2, like its mean square
+
+# device_id,recorded_at followed by the six numeric readings
+_number = r'\s*([-+]?[\d.]+(?:E[-+]?\d+)?)\s*'
+PARSE_RE = re.compile(r'\s*([^,]+?)\s*,\s*([^,]+?)\s*,' + ','.join([_number] * 6))
 
 def audio_callback(indata, frames, time, status):
-    q.put(indata.copy())
+    # Copy straight into the ring: no allocation on the audio thread
+    global ring_head
+    start = ring_head % RING_SIZE
+    end = start + frames
+    if end <= RING_SIZE:
+        np.copyto(ring[start:end], indata[:, 0])
+    else:
+        split = RING_SIZE - start
+        np.copyto(ring[start:], indata[:split, 0])
+        np.copyto(ring[:end - RING_SIZE], indata[split:, 0])
+    ring_head += frames
+    data_ready.set()
 
 def parse_data(data_str):
+    m = PARSE_RE.match(data_str)
+    if not m:
+        print(f"Parse error: unexpected format {data_str!r}")
+        return None
     try:
-        parts = data_str.split(',')
         return {
-            "device_id": parts[0],
-            "recorded_at": parts[1],
-            "carbon_monoxide_ppm": float(parts[2]),
-            "temperature_celcius": float(parts[3]),
-            "pm1_ug_m3": float(parts[4]),
-            "pm2_5_ug_m3": float(parts[5]),
-            "pm4_ug_m3": float(parts[6]),
-            "pm10_ug_m3": float(parts[7])
+            "device_id": m[1],
+            "recorded_at": m[2],
+            "carbon_monoxide_ppm": float(m[3]),
+            "temperature_celcius": float(m[4]),
+            "pm1_ug_m3": float(m[5]),
+            "pm2_5_ug_m3": float(m[6]),
+            "pm4_ug_m3": float(m[7]),
+            "pm10_ug_m3": float(m[8])
         }
     except Exception as e:
         print(f"Parse error: {e}")
         return None
 
 def listen_and_decode():
-    buffer = ''
-    current_symbol = ''
+    buffer = bytearray()  # Decoded characters, decoded to str only for output
+    symbol_len = 0    # elements in the current symbol
+    symbol_bits = 0   # dash bits of the current symbol
     sync_count = 0
     in_signal = False
     receiving_data = False
-    signal_start = time.time()  # Initialize timing variables
-    last_signal = time.time()
+    # Times are on the sample clock: seconds of audio since the stream started
+    signal_start = 0.0
+    last_signal = 0.0
+    block_time = blocksize / samplerate
 
-    with sd.InputStream(callback=audio_callback, channels=1, samplerate=samplerate, blocksize=1024):
+    tail = 0  # read position in the ring
+
+    with sd.InputStream(callback=audio_callback, channels=1, samplerate=samplerate, blocksize=blocksize, dtype='float32'):
         print("Listening for Morse code...")
         while True:
-            try:
-                data = q.get_nowait().flatten()
-                rms = np.sqrt(np.mean(np.square(data)))
-                current_time = time.time()
-
-                if rms > threshold:
-                    if not in_signal:
-                        in_signal = True
-                        signal_start = current_time
-                        last_signal = current_time
-                        if not receiving_data:
-                            if (current_time - last_signal) > 5*dot_duration:
-                                sync_count = 0
-                else:
-                    if in_signal:
-                        in_signal = False
-                        signal_duration = current_time - signal_start
-                        last_signal = current_time
-                        
-                        if signal_duration < 1.5*dot_duration:
-                            current_symbol += '.'
+            available = ring_head - tail
+            if available < blocksize:
+                data_ready.wait(0.01)
+                data_ready.clear()
+                continue
+            if available > RING_SIZE:
+                # Fell a whole ring behind; skip ahead to recent audio
+                tail = ring_head - RING_SIZE // 2
+                tail -= tail % blocksize
+
+            # Take every whole block available (up to the ring's end) at once
+            start = tail % RING_SIZE
+            n_blocks = min(available, RING_SIZE - start) // blocksize
+            blocks = ring[start:start + n_blocks * blocksize].reshape(n_blocks, blocksize)
+            first_block = tail // blocksize
+            tail += n_blocks * blocksize
+
+            # Tone power at the carrier for all blocks in one matmul
+            proj = blocks @ TONE_BASIS
+            loud = np.einsum('ij,ij->i', proj, proj) * TONE_SCALE > threshold_sq
+
+            # Only blocks where the tone turns on or off need Python; the end
+            # of the batch is visited too so a pending character can complete
+            edges = np.flatnonzero(np.diff(loud, prepend=in_signal)).tolist()
+            for k in edges + [n_blocks]:
+                # Character gap: checked at the last quiet block before this edge
+                if k > 0 and not in_signal and (first_block + k) * block_time - signal_start > 3*dot_duration:
+                    if symbol_len:
+                        if symbol_len <= MAX_SYMBOL_LEN:
+                            char = MORSE_TABLE[(symbol_len << 6) | symbol_bits]
                         else:
-                            current_symbol += '-'
-
-                        if not receiving_data:
-                            if current_symbol == '.':
-                                sync_count += 1
-                                if sync_count >= 6:
-                                    receiving_data = True
-                                    buffer = ''
-                            else:
-                                sync_count = 0
-
-                if not in_signal and (current_time - signal_start) > 3*dot_duration:
-                    if current_symbol:
-                        char = MORSE_CODE_REVERSED.get(current_symbol, '?')
-                        buffer += char
-                        current_symbol = ''
+                            char = UNKNOWN_CHAR
+                        buffer.append(char)
+                        symbol_len = 0
+                        symbol_bits = 0
                         
                         if receiving_data:
-                            print(f"\rReceiving: {buffer}", end='')
-                            if buffer.endswith('/'):
-                                data_str = buffer[:-1].strip()
+                            print(f"\rReceiving: {buffer.decode('ascii')}", end='')
+                            if buffer.endswith(b'/'):
+                                data_str = buffer[:-1].decode('ascii').strip()
                                 data = parse_data(data_str)
                                 if data:
                                     print("\n\nValid Data Received:")
                                     print(json.dumps(data, indent=2))
                                 receiving_data = False
-                                buffer = ''
+                                buffer.clear()
 
-                time.sleep(0.001)
-                
-            except queue.Empty:
-                time.sleep(0.01)
+                if k == n_blocks:
+                    break
+                current_time = (first_block + k + 1) * block_time
+
+                if not in_signal:
+                    in_signal = True
+                    signal_start = current_time
+                    last_signal = current_time
+                    if not receiving_data:
+                        if (current_time - last_signal) > 5*dot_duration:
+                            sync_count = 0
+                else:
+                    in_signal = False
+                    signal_duration = current_time - signal_start
+                    last_signal = current_time
+                    
+                    # No branch: a dash sets this element's bit
+                    symbol_bits |= (signal_duration >= dash_min) << symbol_len
+                    symbol_len += 1
+
+                    if not receiving_data:
+                        if symbol_len == 1 and symbol_bits == 0:
+                            sync_count += 1
+                            if sync_count >= 6:
+                                receiving_data = True
+                                buffer.clear()
+                        else:
+                            sync_count = 0
 
 if __name__ == "__main__":
     listen_and_decode()
\ No newline at end of file
@@ -27,31 +27,86 @@ MORSE_CODE_DICT = {
 
 FREQUENCY = 600  # Hz
 DOT_DURATION = 0.1  # Seconds
-
-def text_to_morse(text):
-    return ' '.join(MORSE_CODE_DICT.get(i.upper(), '') for i in text)
-
-def generate_tone(duration):
-    t = np.linspace(0, duration, int(44100 * duration), False)
-    return 0.5 * np.sin(2 * np.pi * FREQUENCY * t)
-
-def play_morse(morse_code):
-    primer = '... / '
-    morse_code = primer + morse_code + ' /'
-    
-    for symbol in morse_code:
-        if symbol == '.':
-            sd.play(generate_tone(DOT_DURATION), samplerate=44100)
+SAMPLE_RATE = 44100
+
+# numexpr evaluates the tone in one multithreaded SIMD pass; plain numpy
+# is used when it is not installed
+USE_NUMEXPR = True
+try:
+    import numexpr as ne
+except ImportError:
+    USE_NUMEXPR = False
+
+def generate_tone(duration, frequency=FREQUENCY, samplerate=SAMPLE_RATE):
+    # float32 and in place: one buffer, no float64 temporaries
+    t = np.arange(int(samplerate * duration), dtype=np.float32)
+    k = np.float32(2 * np.pi * frequency / samplerate)
+    if USE_NUMEXPR:
+        return ne.evaluate('0.5 * sin(k * t)', local_dict={'k': k, 't': t}, out=t)
+    t *= k
+    np.sin(t, out=t)
+    t *= np.float32(0.5)
+    return t
+
+class MorseSender:
+    """Morse keyer for one code table, speed and tone.
+
+    The dot and dash waveforms never change, so they are built once here
+    and shared by every message sent through this instance.
+    """
+
+    def __init__(self, dot_duration=DOT_DURATION, frequency=FREQUENCY,
+                 code_table=MORSE_CODE_DICT, samplerate=SAMPLE_RATE):
+        self.samplerate = samplerate
+        # Morse for every ASCII code point (either case), '' if not sendable
+        self.morse_lut = tuple(code_table.get(chr(c), code_table.get(chr(c).upper(), ''))
+                               for c in range(128))
+        self.dot_wave = generate_tone(dot_duration, frequency, samplerate)
+        self.dash_wave = generate_tone(3*dot_duration, frequency, samplerate)
+
+        # Silence of one dot length, in samples
+        gap = int(samplerate * dot_duration)
+        # Samples each symbol takes up in the rendered message, trailing gap included
+        self.symbol_length = {
+            '.': len(self.dot_wave) + gap,   # dot + inter-symbol space
+            '-': len(self.dash_wave) + gap,  # dash + inter-symbol space
+            ' ': 3 * gap,                    # inter-character space
+            '/': 7 * gap,                    # inter-word space
+        }
+
+    def text_to_morse(self, text):
+        lut = self.morse_lut
+        return ' '.join([lut[c] if c < 128 else '' for c in map(ord, text)])
+
+    def render(self, morse_code):
+        """Whole transmission (primer and trailing word gap included) as one buffer."""
+        primer = '... / '
+        morse_code = primer + morse_code + ' /'
+
+        # Gaps are left as zeros, so only the tones are written
+        symbol_length = self.symbol_length
+        out = np.zeros(sum(symbol_length.get(symbol, 0) for symbol in morse_code),
+                       dtype=self.dot_wave.dtype)
+        pos = 0
+        for symbol in morse_code:
+            if symbol == '.':
+                out[pos:pos + len(self.dot_wave)] = self.dot_wave
+            elif symbol == '-':
+                out[pos:pos + len(self.dash_wave)] = self.dash_wave
+            pos += symbol_length.get(symbol, 0)
+        return out
+
+    def play(self, morse_code, stream=None):
+        """Send a Morse string, into an open output stream if one is given."""
+        out = self.render(morse_code)
+        if stream is not None:
+            stream.write(out)
+        else:
+            # One play call for the whole message: sample-accurate timing
+            sd.play(out, samplerate=self.samplerate)
             sd.wait()
-            time.sleep(DOT_DURATION)
-        elif symbol == '-':
-            sd.play(generate_tone(3*DOT_DURATION), samplerate=44100)
-            sd.wait()
-            time.sleep(DOT_DURATION)
-        elif symbol == ' ':
-            time.sleep(3*DOT_DURATION)
-        elif symbol == '/':
-            time.sleep(7*DOT_DURATION)
+
+morse_sender = MorseSender()
 
 def load_previous_readings():
     if os.path.exists(PREVIOUS_READINGS_FILE):
@@ -62,9 +117,25 @@ def load_previous_readings():
                 pass
     return {device_id: {"co": 0, "temperature": 20, "pm1": 0, "pm2_5": 0, "pm4": 0, "pm10": 0} for device_id in device_ids}
 
+def write_json_atomic(path, data):
+    # Write beside the target then rename over it, so a crash mid-write
+    # never leaves a truncated file behind
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+# Hash of the readings last written to disk, to skip unchanged saves
+_saved_readings_hash = None
+
 def save_previous_readings(previous_readings):
-    with open(PREVIOUS_READINGS_FILE, 'w') as file:
-        json.dump(previous_readings, file)
+    global _saved_readings_hash
+    data = json.dumps(previous_readings, sort_keys=True)
+    data_hash = hash(data)
+    if data_hash == _saved_readings_hash:
+        return
+    write_json_atomic(PREVIOUS_READINGS_FILE, data)
+    _saved_readings_hash = data_hash
 
 def load_progress():
     if os.path.exists(PROGRESS_FILE):
@@ -77,8 +148,7 @@ def load_progress():
     return None
 
 def save_progress(timestamp):
-    with open(PROGRESS_FILE, 'w') as file:
-        json.dump({"last_timestamp": timestamp}, file)
+    write_json_atomic(PROGRESS_FILE, json.dumps({"last_timestamp": timestamp}))
 
 def generate_reading(device_id, previous_readings, timestamp):
     prev = previous_readings.get(device_id, {"co": 0, "temperature": 20, "pm1": 0, "pm2_5": 0, "pm4": 0, "pm10": 0})
@@ -142,7 +212,7 @@ def handle_reading(timestamp, device_id, previous_readings):
     
     print(message)
     print("\nStarting radio transmission...")
-    play_morse(text_to_morse(message))
+    morse_sender.play(morse_sender.text_to_morse(message))
     print("Radio transmission complete\n")
 
 def main(start_date, end_date):
@@ -33,15 +33,18 @@ if __name__ == "__main__":
     print("Listening for Morse dots... Press Ctrl+C to stop.")
     try:
         while True:
-            data = ser.read()  # Read one byte at a time
-            if data == b'1':  # Start of dot
-                last_dot_time = time.time()
-                print("[START] Dot detected...")
-            
-            elif data == b'0' and last_dot_time is not None:  # End of dot
-                end_time = time.time()
-                log_dot_duration(last_dot_time, end_time)
-                last_dot_time = None  # Reset for next dot
+            # Take everything already buffered in one call (blocks for one byte
+            # when idle); bytes from the same read share a timestamp
+            data = ser.read(max(1, ser.in_waiting))
+            now = time.time()
+            for byte in data:
+                if byte == 0x31:  # b'1': start of dot
+                    last_dot_time = now
+                    print("[START] Dot detected...")
+                
+                elif byte == 0x30 and last_dot_time is not None:  # b'0': end of dot
+                    log_dot_duration(last_dot_time, now)
+                    last_dot_time = None  # Reset for next dot
 
     except KeyboardInterrupt:
         print("\nStopping receiver...")
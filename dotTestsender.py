@@ -17,6 +17,10 @@ except serial.SerialException:
 # Define the dot frequency (in Hz)
 DOT_FREQUENCY = 800
 
+# Serial commands, built directly as bytes since they never change
+DOT_COMMAND = b"SIGNAL %d\r\n" % DOT_FREQUENCY
+STOP_COMMAND = b"SIGNAL 0\r\n"
+
 # Calculate transmission time for commands at 110 baud
 def calculate_transmission_time(command):
     # At 110 baud with 10 bits per byte (8 data + start + stop)
@@ -30,7 +34,7 @@ def send_single_dot():
     debug_log("Preparing to send a single dot...")
     
     # Command to send
-    command = f"SIGNAL {DOT_FREQUENCY}\r\n"
+    command = DOT_COMMAND
     
     # Calculate how long the command will take to transmit
     transmission_time = calculate_transmission_time(command)
@@ -38,7 +42,7 @@ def send_single_dot():
     
     # Send the dot frequency
     debug_log(f"Sending DOT signal: Frequency={DOT_FREQUENCY}Hz")
-    ser.write(command.encode())
+    ser.write(command)
     ser.flush()
     
     # Wait for the command to fully transmit, plus the dot duration
@@ -47,10 +51,10 @@ def send_single_dot():
     time.sleep(total_wait)
     
     # Stop transmission
-    stop_command = f"SIGNAL 0\r\n"
+    stop_command = STOP_COMMAND
     stop_transmission_time = calculate_transmission_time(stop_command)
     debug_log(f"Sending STOP signal (transmission time: {stop_transmission_time:.4f} seconds)")
-    ser.write(stop_command.encode())
+    ser.write(stop_command)
     ser.flush()
     
     # Wait for stop command to fully transmit
@@ -67,7 +71,7 @@ if __name__ == "__main__":
     finally:
         # Make sure to stop any transmission and close properly
         debug_log("Ensuring all transmissions are stopped...")
-        ser.write(f"SIGNAL 0\r\n".encode())
+        ser.write(STOP_COMMAND)
         ser.flush()
         time.sleep(1.0)  # Generous time to ensure final stop command is processed
         
@@ -4,14 +4,18 @@ AFSK Receiver - Optimized for Baofeng UV-5R
 Updated to handle VOX-enabled transmissions
 """
 
+import binascii
 import numpy as np
 import pyaudio
 import time
+import queue
+import concurrent.futures
 import threading
 from collections import deque
-import scipy.signal as signal
 import argparse
 import sys
+import os
+import re
 
 #=====================================================
 # CONFIGURABLE PARAMETERS - Adjust as needed
@@ -25,9 +29,11 @@ SAMPLE_RATE = 44100   # Hz
 
 # Receiver parameters
 NOISE_FLOOR = 0.008   # Threshold for signal detection (0.0-1.0)
-FILTER_BANDWIDTH = 200  # Hz on each side of mark/space frequencies
-FILTER_ORDER = 6      # Filter order, higher = sharper but more CPU intensive
 BUFFER_SECONDS = 5    # Size of audio buffer in seconds
+FRAMES_PER_BUFFER = 1024  # Samples per PyAudio callback
+PA_LATENCY_MSEC = 3   # Minimum PortAudio latency hint (ms)
+RT_PRIORITY = 20      # SCHED_FIFO priority for the audio process (needs root)
+RECENT_PACKETS = 16   # Payloads remembered for duplicate suppression
 
 # Protocol parameters - must match transmitter
 START_FLAG_VALUE = 0x7E  # Start flag byte
@@ -44,19 +50,32 @@ START_FLAG = bytes([START_FLAG_VALUE])
 END_FLAG = bytes([END_FLAG_VALUE])
 ESCAPE = bytes([ESCAPE_VALUE])
 
+# int16 full scale -> [-1.0, 1.0)
+SAMPLE_SCALE = np.float32(1.0 / 32768.0)
+
+# Weight of each bit of a byte, least significant bit first as transmitted
+BIT_WEIGHTS = (1 << np.arange(8)).astype(np.uint8)
+
+# Candidate frames: start flag, at least 4 non-flag bytes, then an end flag.
+# The end flag is a lookahead so back-to-back frames can share a flag.
+FRAME_PATTERN = re.compile(
+    re.escape(START_FLAG) + b'([^' + re.escape(END_FLAG) + b']{4,})(?=' + re.escape(END_FLAG) + b')',
+    re.DOTALL
+)
+
+# An escape byte and the byte it protects, and the original value of each
+# such pair
+ESCAPE_PATTERN = re.compile(re.escape(ESCAPE) + b'(.)', re.DOTALL)
+_UNESCAPED = {bytes([byte]): bytes([byte ^ ESCAPE_MASK]) for byte in range(256)}
+
+def _unescape_pair(match):
+    return _UNESCAPED[match.group(1)]
+
 # CRC-16 XMODEM implementation
 def crc16_xmodem(data):
-    crc = 0x0000
-    poly = 0x1021
-    
-    for byte in data:
-        crc ^= (byte << 8)
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = ((crc << 1) ^ poly) & 0xFFFF
-            else:
-                crc = (crc << 1) & 0xFFFF
-    return crc
+    # XMODEM is CRC-CCITT (poly 0x1021) seeded with 0, which binascii
+    # computes in C rather than one Python step per byte
+    return binascii.crc_hqx(data, 0x0000)
 
 class Packet:
     def __init__(self, data=None, packet_id=0, packet_type=0):
@@ -65,112 +84,161 @@ class Packet:
         self.packet_type = packet_type & 0xFF
     
     @staticmethod
-    def decode(raw_bytes):
+    def decode(raw_bytes, start=0):
         """
         Decode a byte stream into a Packet object
         
         Args:
             raw_bytes (bytes): The received byte stream
+            start (int): Index to start searching for a start flag from
             
         Returns:
             Packet: The decoded packet, or None if invalid
         """
-        # Find start and end flags
         try:
-            # Strip preamble and find start flag
-            start_idx = raw_bytes.find(START_FLAG)
-            if start_idx == -1:
-                return None
-                
-            # Find end flag after start flag
-            end_idx = raw_bytes.find(END_FLAG, start_idx + 1)
-            if end_idx == -1:
-                return None
-                
-            # Extract the stuffed frame
-            stuffed_frame = raw_bytes[start_idx + 1:end_idx]
+            # Scan every flag-delimited candidate in C and keep the first one
+            # that survives unstuffing and the CRC check
+            for match in FRAME_PATTERN.finditer(raw_bytes, start):
+                packet = Packet._decode_frame(match.group(1))
+                if packet:
+                    return packet
+            return None
             
-            # Unstuff the bytes
-            unstuffed = bytearray()
-            i = 0
-            while i < len(stuffed_frame):
-                if stuffed_frame[i] == ESCAPE_VALUE:  # Escape character
-                    if i + 1 >= len(stuffed_frame):
-                        return None  # Invalid escape sequence
-                    unstuffed.append(stuffed_frame[i + 1] ^ ESCAPE_MASK)
-                    i += 2  # Skip the escape and the escaped byte
-                else:
-                    unstuffed.append(stuffed_frame[i])
-                    i += 1
-                    
-            # Verify length (at least 4 bytes: 2 for header, 2 for CRC)
-            if len(unstuffed) < 4:
-                return None
-                
-            # Extract parts
-            frame = bytes(unstuffed)
-            payload = frame[:-2]
-            received_crc = int.from_bytes(frame[-2:], byteorder='big')
+        except Exception as e:
+            print(f"Error decoding packet: {e}")
+            return None
+    
+    @staticmethod
+    def _decode_frame(stuffed_frame):
+        """
+        Unstuff and verify a single frame taken from between the flags
+        
+        Args:
+            stuffed_frame (bytes): Frame contents without the flags
             
-            # Verify CRC
-            calculated_crc = crc16_xmodem(payload)
-            if calculated_crc != received_crc:
-                return None  # CRC check failed
+        Returns:
+            Packet: The decoded packet, or None if invalid
+        """
+        # An odd run of escapes at the very end leaves the last one dangling
+        trailing_escapes = len(stuffed_frame) - len(stuffed_frame.rstrip(ESCAPE))
+        if trailing_escapes % 2:
+            return None  # Invalid escape sequence
+        
+        # Unstuff the bytes: escape pairs are rare, so most frames pass through
+        # untouched and the rest are rewritten by the regex engine in one pass
+        if ESCAPE in stuffed_frame:
+            unstuffed = ESCAPE_PATTERN.sub(_unescape_pair, stuffed_frame)
+        else:
+            unstuffed = stuffed_frame
                 
-            # Extract header
-            packet_id = payload[0]
-            packet_type = payload[1]
-            data = payload[2:]
+        # Verify length (at least 4 bytes: 2 for header, 2 for CRC)
+        if len(unstuffed) < 4:
+            return None
             
-            # Create and return the packet
-            packet = Packet(data, packet_id, packet_type)
-            return packet
+        # Extract parts
+        frame = unstuffed
+        payload = frame[:-2]
+        received_crc = int.from_bytes(frame[-2:], byteorder='big')
+        
+        # Verify CRC
+        calculated_crc = crc16_xmodem(payload)
+        if calculated_crc != received_crc:
+            return None  # CRC check failed
             
-        except Exception as e:
-            print(f"Error decoding packet: {e}")
-            return None
+        # Extract header
+        packet_id = payload[0]
+        packet_type = payload[1]
+        data = payload[2:]
+        
+        # Create and return the packet
+        return Packet(data, packet_id, packet_type)
+
+def abs2(z):
+    """
+    Squared magnitude |z|^2 of a real or complex array
+    
+    Same result as np.abs(z)**2 but without the sqrt and the extra temporary.
+    
+    Args:
+        z (ndarray): Real or complex samples
+        
+    Returns:
+        ndarray: Per-sample energy
+    """
+    if np.iscomplexobj(z):
+        return z.real * z.real + z.imag * z.imag
+    return z * z
 
 def bits_to_bytes(bits):
     """
     Convert a list of bits to bytes
     
     Args:
-        bits (list): List of bits (0s and 1s)
+        bits (list or ndarray): Bits (0s and 1s), least significant bit first
         
     Returns:
-        bytes: Reconstructed bytes
+        bytes: Reconstructed bytes, the last one zero-padded
     """
-    # Ensure the number of bits is a multiple of 8
-    while len(bits) % 8 != 0:
-        bits.append(0)
-        
-    result = bytearray()
-    for i in range(0, len(bits), 8):
-        byte = 0
-        for j in range(8):
-            if i + j < len(bits):
-                byte |= (bits[i + j] << j)
-        result.append(byte)
-    return bytes(result)
+    # packbits pads the final partial byte with zeros itself, and the
+    # caller's list is no longer extended in place
+    return np.packbits(np.asarray(bits, dtype=np.uint8), bitorder='little').tobytes()
 
-def create_bandpass_filter(low_freq, high_freq, sample_rate=SAMPLE_RATE, order=FILTER_ORDER):
+def tone_basis(freqs, num_samples, sample_rate=SAMPLE_RATE):
     """
-    Create a bandpass filter for the given frequency range
+    Build cos/sin reference columns for a single-bin DFT at each frequency
     
     Args:
-        low_freq (float): Lower cutoff frequency in Hz
-        high_freq (float): Upper cutoff frequency in Hz
+        freqs (sequence): Tone frequencies in Hz
+        num_samples (int): Window length in samples
         sample_rate (int): Sample rate in Hz
-        order (int): Filter order
         
     Returns:
-        tuple: (b, a) filter coefficients
+        ndarray: (num_samples, 2 * len(freqs)) float32, cos/sin pairs per tone
     """
-    nyquist = 0.5 * sample_rate
-    low = low_freq / nyquist
-    high = high_freq / nyquist
-    b, a = signal.butter(order, [low, high], btype='band')
-    return b, a
+    phase = 2 * np.pi * np.outer(np.arange(num_samples), freqs) / sample_rate
+    basis = np.empty((num_samples, 2 * len(freqs)), dtype=np.float32)
+    basis[:, 0::2] = np.cos(phase)
+    basis[:, 1::2] = np.sin(phase)
+    return basis
+
+def goertzel_power(samples, basis):
+    """
+    Power at each tone of a basis from tone_basis (Goertzel, evaluated directly)
+    
+    Only the bins that matter are computed: two dot products per tone and
+    no filter state, instead of band-pass filtering the whole window.
+    
+    Args:
+        samples (ndarray): Window of samples, or a stack of windows (n, num_samples)
+        basis (ndarray): Reference columns from tone_basis
+        
+    Returns:
+        ndarray: Power per tone, shape (..., len(freqs))
+    """
+    proj = abs2(samples @ basis)
+    return proj[..., 0::2] + proj[..., 1::2]
+
+def demodulate(samples, basis, samples_per_bit):
+    """
+    Slice a buffer into bit periods and decide every bit in one pass
+    
+    The last, possibly partial, bit period is left out, as it may still be
+    filling.
+    
+    Args:
+        samples (ndarray): Contiguous audio samples
+        basis (ndarray): Mark/space reference columns from tone_basis
+        samples_per_bit (int): Samples in one bit period
+        
+    Returns:
+        tuple: (bits, mark_energy, space_energy), uint8 bits (1 = mark) and
+            the per-bit tone powers
+    """
+    num_bits = max(0, (len(samples) - 1) // samples_per_bit)
+    windows = samples[:num_bits * samples_per_bit].reshape(num_bits, samples_per_bit)
+    mark_energy, space_energy = goertzel_power(windows, basis).T
+    bits = np.greater(mark_energy, space_energy).view(np.uint8)
+    return bits, mark_energy, space_energy
 
 class AFSKReceiver:
     """AFSK receiver for capturing and decoding data from audio."""
@@ -185,30 +253,41 @@ class AFSKReceiver:
         """
         self.sample_rate = sample_rate
         self.bit_duration = 1.0 / BAUD_RATE
+        # PortAudio reads this when it initializes, so set it before PyAudio()
+        os.environ.setdefault('PA_MIN_LATENCY_MSEC', str(PA_LATENCY_MSEC))
         self.audio = pyaudio.PyAudio()
         self.callback = callback
         self.running = False
-        self.buffer = deque(maxlen=int(sample_rate * BUFFER_SECONDS))
+        # Audio ring: the callback is the only writer (write_count) and the
+        # decode stage only moves read_start, so no lock is needed. Every
+        # sample is stored twice, ring_capacity apart, so any window of up to
+        # ring_capacity samples is one contiguous view. The spare blocks
+        # beyond buffer_size keep the callback from overwriting a window
+        # while it is being demodulated.
+        self.buffer_size = int(sample_rate * BUFFER_SECONDS)
+        self.ring_capacity = self.buffer_size + 8 * FRAMES_PER_BUFFER
+        self.ring = np.zeros(2 * self.ring_capacity, dtype=np.float32)
+        self.write_count = 0  # Samples ever written
+        self.read_start = 0   # Oldest sample still wanted, as a write count
+        self.data_ready = threading.Event()  # Set by the callback as new bits arrive
+        self._notified_count = 0  # write_count when data_ready was last set
+        self._abs_scratch = np.empty(FRAMES_PER_BUFFER, dtype=np.int32)  # Callback level buffer
+        # Mean absolute level of each callback block, measured on the raw int16
+        # samples so the processing loop can gate without converting the buffer
+        self.block_levels = deque(maxlen=self.buffer_size // FRAMES_PER_BUFFER + 1)
         self.last_packet_time = 0
-        self.recent_packet_data = set()  # Store hashes of recent packets to avoid duplicates
-        
-        # Create filters for mark and space frequencies
-        self.mark_filter = create_bandpass_filter(
-            MARK_FREQ - FILTER_BANDWIDTH, 
-            MARK_FREQ + FILTER_BANDWIDTH, 
-            sample_rate
-        )
-        self.space_filter = create_bandpass_filter(
-            SPACE_FREQ - FILTER_BANDWIDTH, 
-            SPACE_FREQ + FILTER_BANDWIDTH, 
-            sample_rate
-        )
+        self.recent_packet_data = deque(maxlen=RECENT_PACKETS)  # Recent payloads, oldest evicted first
+        self.bit_queue = queue.SimpleQueue()  # Bit extraction -> packet decode hand-off
+        self.executor = None
+        
+        # Goertzel references for mark and space over one bit period
+        self.samples_per_bit = int(self.bit_duration * sample_rate)
+        self.tone_basis = tone_basis((MARK_FREQ, SPACE_FREQ), self.samples_per_bit, sample_rate)
         
         print(f"Receiver initialized with:")
         print(f"- Mark frequency: {MARK_FREQ} Hz")
         print(f"- Space frequency: {SPACE_FREQ} Hz")
         print(f"- Baud rate: {BAUD_RATE} bps")
-        print(f"- Filter bandwidth: {FILTER_BANDWIDTH} Hz")
         print(f"- Noise floor: {NOISE_FLOOR}")
         
     def __del__(self):
@@ -224,21 +303,88 @@ class AFSKReceiver:
         if status:
             print(f"PyAudio status: {status}")
             
-        # Convert bytes to numpy array
-        audio_data = np.frombuffer(in_data, dtype=np.int16).astype(np.float32) / 32768.0
+        # View the int16 samples in place, no per-callback allocations
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        if samples.size > self._abs_scratch.size:
+            self._abs_scratch = np.empty(samples.size, dtype=np.int32)
+        
+        # Coarse level on the integer samples (int32 so -32768 doesn't wrap)
+        if samples.size:
+            levels = np.abs(samples, out=self._abs_scratch[:samples.size], dtype=np.int32)
+            self.block_levels.append(levels.sum() / (samples.size * 32768.0))
         
-        # Add to buffer
-        self.buffer.extend(audio_data)
+        # Convert to float32 straight into the buffer
+        self._ring_write(samples)
         
         return (None, pyaudio.paContinue)
     
+    def _ring_write(self, data):
+        """
+        Append samples to the audio ring (audio callback only).
+        
+        The int16 -> float32 scaling is written directly into the ring, then
+        copied to the mirror half.
+        
+        Args:
+            data (ndarray): int16 samples, at most ring_capacity of them
+        """
+        capacity = self.ring_capacity
+        ring = self.ring
+        pos = self.write_count % capacity
+        first = min(len(data), capacity - pos)
+        np.multiply(data[:first], SAMPLE_SCALE, out=ring[pos:pos + first], casting='unsafe')
+        ring[capacity + pos:capacity + pos + first] = ring[pos:pos + first]
+        rest = len(data) - first
+        if rest:
+            np.multiply(data[first:], SAMPLE_SCALE, out=ring[:rest], casting='unsafe')
+            ring[capacity:capacity + rest] = ring[:rest]
+        # Publish only once the samples are in place
+        self.write_count += len(data)
+        
+        # Wake the processing stage once enough new audio for a few bits is in
+        if self.write_count - self._notified_count >= self.samples_per_bit * 8:
+            self._notified_count = self.write_count
+            self.data_ready.set()
+    
+    def _buffered_samples(self):
+        """Number of samples currently in the buffer."""
+        write_count = self.write_count
+        return write_count - max(self.read_start, write_count - self.buffer_size)
+    
+    def _buffer_view(self):
+        """
+        The buffered samples, oldest first, as a contiguous view of the ring.
+        
+        Returns:
+            tuple: (start, view), the write count of the first sample and a
+                float32 view valid until the callback laps it
+        """
+        write_count = self.write_count
+        start = max(self.read_start, write_count - self.buffer_size)
+        pos = start % self.ring_capacity
+        return start, self.ring[pos:pos + write_count - start]
+    
+    def _set_realtime_priority(self):
+        """
+        Try to run the process under SCHED_FIFO to reduce callback jitter.
+        Falls back silently to normal scheduling when not permitted.
+        """
+        if not hasattr(os, 'sched_setscheduler'):
+            return
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(RT_PRIORITY))
+            print(f"Real-time scheduling enabled (SCHED_FIFO {RT_PRIORITY})")
+        except (PermissionError, OSError):
+            print("Real-time scheduling not permitted, using normal priority")
+    
     def start(self):
         """Start receiving audio."""
         if self.running:
             return
             
         self.running = True
-        self.buffer.clear()
+        self.read_start = self.write_count
+        self.block_levels.clear()
         
         # List available input devices
         print("\nAvailable audio input devices:")
@@ -257,6 +403,8 @@ class AFSKReceiver:
             default_device_index = None
             print("Could not determine default input device. Using system default.")
         
+        self._set_realtime_priority()
+        
         # Start audio stream
         try:
             self.stream = self.audio.open(
@@ -265,7 +413,7 @@ class AFSKReceiver:
                 rate=self.sample_rate,
                 input=True,
                 input_device_index=default_device_index,
-                frames_per_buffer=1024,
+                frames_per_buffer=FRAMES_PER_BUFFER,
                 stream_callback=self._audio_callback
             )
             print("Audio stream opened successfully.")
@@ -274,10 +422,14 @@ class AFSKReceiver:
             self.running = False
             return
         
-        # Start processing thread
-        self.process_thread = threading.Thread(target=self._process_audio)
-        self.process_thread.daemon = True
-        self.process_thread.start()
+        # Start the two processing stages: bit extraction and packet decoding
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        self.stage_futures = [
+            self.executor.submit(self._process_audio),
+            self.executor.submit(self._decode_packets),
+        ]
+        for future in self.stage_futures:
+            future.add_done_callback(self._report_stage_error)
         print("Audio processing started. Waiting for signals...")
         
     def stop(self):
@@ -286,30 +438,42 @@ class AFSKReceiver:
             return
             
         self.running = False
+        self.data_ready.set()  # Let the processing stage see running is off
         if hasattr(self, 'stream'):
             self.stream.stop_stream()
             self.stream.close()
             
-        if hasattr(self, 'process_thread'):
-            self.process_thread.join(timeout=1.0)
+        if self.executor:
+            self.bit_queue.put(None)  # Wake the decode stage so it can exit
+            concurrent.futures.wait(self.stage_futures, timeout=1.0)
+            self.executor.shutdown(wait=False)
+            self.executor = None
+    
+    @staticmethod
+    def _report_stage_error(future):
+        """Print exceptions raised inside a processing stage."""
+        if not future.cancelled() and future.exception():
+            print(f"Processing stage stopped: {future.exception()}")
     
     def _process_audio(self):
-        """Process received audio to extract data."""
-        samples_per_bit = int(self.bit_duration * self.sample_rate)
+        """Stage 1: demodulate the audio buffer into bits for the decode stage."""
+        samples_per_bit = self.samples_per_bit
         noise_floor = NOISE_FLOOR
-        last_bits = []
+        last_bits = None
         
         while self.running:
             # Wait for enough data
-            if len(self.buffer) < samples_per_bit * 8:
-                time.sleep(0.1)
+            # Sleep until the callback has delivered new audio
+            self.data_ready.wait(timeout=1.0)
+            self.data_ready.clear()
+            
+            if self._buffered_samples() < samples_per_bit * 8:
                 continue
                 
-            # Get buffer as numpy array
-            buffer_array = np.array(self.buffer)
-            
-            # Check signal strength
-            signal_power = np.mean(np.abs(buffer_array))
+            # Check signal strength from the per-block levels; the float buffer
+            # is only read once there is something worth demodulating
+            levels = list(self.block_levels)
+            signal_power = sum(levels) / len(levels) if levels else 0.0
             
             # Debug info occasionally
             current_time = time.time()
@@ -319,72 +483,91 @@ class AFSKReceiver:
                     
             if signal_power < noise_floor:
                 # No significant signal detected
-                time.sleep(0.1)
                 continue
                 
-            # Process buffer in bit-sized chunks
-            bits = []
-            energy_ratio_log = []  # For debugging
+            # Current buffer contents as a view into the ring, no copy
+            buffer_start, buffer_array = self._buffer_view()
             
-            for i in range(0, len(buffer_array) - samples_per_bit, samples_per_bit):
-                chunk = buffer_array[i:i + samples_per_bit]
-                
-                # Apply filters
-                mark_filtered = signal.lfilter(self.mark_filter[0], self.mark_filter[1], chunk)
-                space_filtered = signal.lfilter(self.space_filter[0], self.space_filter[1], chunk)
-                
-                # Calculate energy in each band
-                mark_energy = np.sum(mark_filtered**2)
-                space_energy = np.sum(space_filtered**2)
+            # Decide every bit-sized window in one pass; a bit is 1 where the
+            # mark tone has more energy than the space tone
+            bits, mark_energy, space_energy = demodulate(buffer_array, self.tone_basis, samples_per_bit)
+            
+            # Energy ratios for debugging
+            voiced = space_energy > 0
+            energy_ratio_log = (mark_energy[voiced] / space_energy[voiced]).tolist()
+            
+            # Hand new bits to the decode stage
+            if len(bits) >= 16 and not np.array_equal(bits, last_bits):  # At least enough bits for a small packet
+                self.bit_queue.put((buffer_start, bits, signal_power, energy_ratio_log))
+            
+            last_bits = bits
+    
+    def _decode_packets(self):
+        """Stage 2: search bit blocks for packets, verify and deliver them."""
+        samples_per_bit = self.samples_per_bit
+        last_start = None   # Buffer start of the previous block
+        last_bit_count = 0  # Bits in the previous block
+        
+        while self.running:
+            item = self.bit_queue.get()
+            if item is None:
+                break
+            buffer_start, bits, signal_power, energy_ratio_log = item
+            
+            # Frames can start at any bit, not just at multiples of 8 from the
+            # buffer start. Read the byte value at every bit offset, and only
+            # pack and search the alignments that hold at least two flags
+            byte_values = np.lib.stride_tricks.sliding_window_view(bits, 8) @ BIT_WEIGHTS
+            flags = np.flatnonzero(byte_values == START_FLAG_VALUE)
+            alignments, flag_counts = np.unique(flags % 8, return_counts=True)
+            
+            packet = None
+            for alignment in alignments[flag_counts >= 2].tolist():
+                packet_bytes = bits_to_bytes(bits[alignment:])
                 
-                # Calculate energy ratio for debugging
-                if space_energy > 0:
-                    energy_ratio = mark_energy / space_energy
-                    energy_ratio_log.append(energy_ratio)
+                # While the buffer start holds still, each block extends the
+                # last one. Frames ending before its final (possibly partial)
+                # byte were already tried, so resume at the last start flag
+                # before that byte
+                scan_from = 0
+                if buffer_start == last_start:
+                    tail = max((last_bit_count - alignment + 7) // 8 - 1, 0)
+                    flag = packet_bytes.rfind(START_FLAG, 0, tail)
+                    scan_from = flag if flag >= 0 else tail
                 
-                # Determine bit value based on which frequency has more energy
-                if mark_energy > space_energy:
-                    bits.append(1)
-                else:
-                    bits.append(0)
-            
-            # Look for packets only if we have new bits
-            if bits != last_bits and len(bits) >= 16:  # At least enough bits for a small packet
                 # Try to find a complete packet
-                packet_bytes = bits_to_bytes(bits)
-                packet = Packet.decode(packet_bytes)
-                
+                packet = Packet.decode(packet_bytes, scan_from)
                 if packet:
-                    # Hash the packet data to check for duplicates
-                    packet_hash = hash(packet.data)
+                    break
+            last_start = buffer_start
+            last_bit_count = len(bits)
+            
+            if packet:
+                # Only process if not a duplicate (can happen with repeated transmissions).
+                # Payloads are short, so comparing them outright is as cheap as
+                # hashing and cannot collide
+                if packet.data not in self.recent_packet_data:
+                    # Add to recent packets; the deque drops the oldest one
+                    self.recent_packet_data.append(packet.data)
                     
-                    # Only process if not a duplicate (can happen with repeated transmissions)
-                    if packet_hash not in self.recent_packet_data:
-                        # Add to recent packets
-                        self.recent_packet_data.add(packet_hash)
-                        if len(self.recent_packet_data) > 10:  # Keep only the most recent packets
-                            self.recent_packet_data.pop()
-                        
-                        # Valid packet found, call the callback
-                        if self.callback:
-                            self.callback(packet)
-                        
-                        # Update last packet time
-                        self.last_packet_time = time.time()
-                        
-                        # Print diagnostic info about signal strength
-                        if energy_ratio_log:
-                            avg_ratio = sum(energy_ratio_log) / len(energy_ratio_log)
-                            print(f"Signal quality: power={signal_power:.6f}, mark/space ratio={avg_ratio:.2f}")
+                    # Valid packet found, call the callback
+                    if self.callback:
+                        self.callback(packet)
                     
-                    # Clear most of the buffer but keep the tail in case it contains
-                    # the start of another packet
-                    retain = min(samples_per_bit * 8, len(self.buffer) // 4)
-                    for _ in range(len(self.buffer) - retain):
-                        self.buffer.popleft()
-            
-            last_bits = bits
-            time.sleep(0.1)  # Prevent CPU overuse
+                    # Update last packet time
+                    self.last_packet_time = time.time()
+                    
+                    # Print diagnostic info about signal strength
+                    if energy_ratio_log:
+                        avg_ratio = sum(energy_ratio_log) / len(energy_ratio_log)
+                        print(f"Signal quality: power={signal_power:.6f}, mark/space ratio={avg_ratio:.2f}")
+                
+                # Clear most of the buffer but keep the tail in case it contains
+                # the start of another packet
+                retain = min(samples_per_bit * 8, self._buffered_samples() // 4)
+                self.read_start = self.write_count - retain
+                for _ in range(len(self.block_levels) - (retain // FRAMES_PER_BUFFER + 1)):
+                    self.block_levels.popleft()
 
 def receive_callback(packet):
     """
@@ -411,6 +594,8 @@ def receive_callback(packet):
 
 def main():
     """Main entry point for the AFSK receiver."""
+    global NOISE_FLOOR
+    
     parser = argparse.ArgumentParser(description="AFSK Receiver")
     
     parser.add_argument("-t", "--time", type=int, default=0, 
@@ -424,7 +609,6 @@ def main():
     args = parser.parse_args()
     
     # Override noise floor if specified
-    global NOISE_FLOOR
     if args.noise != NOISE_FLOOR:
         NOISE_FLOOR = args.noise
         print(f"Noise floor set to: {NOISE_FLOOR}")
@@ -2,7 +2,6 @@ import numpy as np
 import pyaudio
 import time
 import re
-from scipy import signal
 import threading
 import queue
 
@@ -13,29 +12,53 @@ SPACE_FREQ = 2200    # Hz (binary 0)
 BAUD_RATE = 1200     # bits per second
 SAMPLES_PER_BIT = int(SAMPLE_RATE / BAUD_RATE)
 CHUNK_SIZE = 1024    # Audio buffer size
+AUDIO_BUFFER_CHUNKS = 16  # Chunks held between the audio callback and the processing thread
 
-# Create bandpass filters for mark and space frequencies
-def create_bandpass_filter(center_freq, bandwidth):
-    """Create a bandpass filter for the given center frequency"""
-    nyquist = SAMPLE_RATE / 2.0
-    low = (center_freq - bandwidth/2) / nyquist
-    high = (center_freq + bandwidth/2) / nyquist
-    b, a = signal.butter(3, [low, high], btype='band')
-    return b, a
+# Packet formats: payload then '*' and a two-digit hex checksum
+TEMP_RE = re.compile(rb'TEMP:([\d.]+)\*([0-9A-F]{2})')
+TEST_RE = re.compile(rb'TEST:([A-Z]+)\*([0-9A-F]{2})')
 
-# Create our filters
-MARK_FILTER = create_bandpass_filter(MARK_FREQ, 300)
-SPACE_FILTER = create_bandpass_filter(SPACE_FREQ, 300)
+def find_packet(pattern, header, buffer):
+    """Leftmost match of pattern, tried only where its header occurs.
+    
+    Same result as pattern.search(buffer), but the buffer is scanned by a
+    plain substring find and the regex runs anchored at each header.
+    """
+    pos = buffer.find(header)
+    while pos >= 0:
+        match = pattern.match(buffer, pos)
+        if match:
+            return match
+        pos = buffer.find(header, pos + 1)
+    return None
+
+# Goertzel (single-bin DFT) references for mark and space over one bit:
+# cos/sin columns, so one bit's tone powers are a single small matmul
+_phase = 2 * np.pi * np.outer(np.arange(SAMPLES_PER_BIT), (MARK_FREQ, SPACE_FREQ)) / SAMPLE_RATE
+TONE_BASIS = np.empty((SAMPLES_PER_BIT, 4), dtype=np.float32)
+TONE_BASIS[:, 0::2] = np.cos(_phase)
+TONE_BASIS[:, 1::2] = np.sin(_phase)
+
+def goertzel_power(samples, out=None):
+    """Power at the mark and space tones of a bit window (or stack of windows)"""
+    proj = np.matmul(samples, TONE_BASIS, out=out)
+    proj *= proj
+    return proj[..., 0::2] + proj[..., 1::2]
 
 class AFSKReceiver:
     def __init__(self):
-        self.bit_buffer = []
-        self.char_buffer = ""
-        self.packet_buffer = ""
+        self.frame = 0  # 10-bit shift register, first bit received ends up in bit 0
+        self.char_buffer = bytearray()    # Raw received bytes, decoded only for display
+        self.packet_buffer = bytearray()
         self.receiving = False
         self.last_bit = None
         self.bit_count = 0
         self.last_transition = 0
+        # Scratch reused for every chunk: the partial bit left over from the
+        # last chunk sits at the front of sample_buffer, followed by the new chunk
+        self.sample_buffer = np.empty(SAMPLES_PER_BIT + CHUNK_SIZE, dtype=np.float32)
+        self.pending = 0  # Samples of that partial bit
+        self.proj_buffer = np.empty((len(self.sample_buffer) // SAMPLES_PER_BIT, 4), dtype=np.float32)
         self.debug_mode = False
         
     def set_debug(self, debug):
@@ -44,83 +67,110 @@ class AFSKReceiver:
         
     def process_bit(self, bit):
         """Process a decoded bit, looking for start/stop bits pattern"""
-        # Look for bit transitions to help with synchronization
-        if self.last_bit is not None and self.last_bit != bit:
-            if self.debug_mode:
-                print(f"Bit transition: {self.last_bit} -> {bit}")
-            self.last_transition = 0
-        else:
-            self.last_transition += 1
+        self.process_bits((bit,))
+    
+    def process_bits(self, bits):
+        """Run a sequence of decoded bits through the start/stop framing.
         
-        # If we've seen too many of the same bit in a row, we might be out of sync
-        if self.last_transition > 20:  # Arbitrary threshold
-            if self.receiving and self.debug_mode:
-                print("Too many identical bits - resetting receiver")
-            self.receiving = False
-            self.bit_count = 0
-            self.bit_buffer = []
-            self.last_transition = 0
+        The framing state is kept in locals for the whole run and written
+        back once, instead of going through attributes on every bit.
+        """
+        last_bit = self.last_bit
+        last_transition = self.last_transition
+        receiving = self.receiving
+        frame = self.frame
+        bit_count = self.bit_count
+        debug_mode = self.debug_mode
         
-        if not self.receiving:
-            # Looking for start bit (0)
-            if bit == 0 and (self.last_bit == 1 or self.last_bit is None):
-                self.receiving = True
-                self.bit_buffer = [0]  # Start bit
-                self.bit_count = 1
-                if self.debug_mode:
-                    print("Start bit detected - beginning character reception")
-        else:
-            # Add bit to buffer
-            self.bit_buffer.append(bit)
-            self.bit_count += 1
+        for bit in bits:
+            # Look for bit transitions to help with synchronization
+            if last_bit is not None and last_bit != bit:
+                if debug_mode:
+                    print(f"Bit transition: {last_bit} -> {bit}")
+                last_transition = 0
+            else:
+                last_transition += 1
+            
+            # If we've seen too many of the same bit in a row, we might be out of sync
+            if last_transition > 20:  # Arbitrary threshold
+                if receiving and debug_mode:
+                    print("Too many identical bits - resetting receiver")
+                receiving = False
+                bit_count = 0
+                frame = 0
+                last_transition = 0
             
-            # Check if we have a complete character (10 bits)
-            if self.bit_count == 10:
-                self.decode_character()
-                self.receiving = False
-                self.bit_count = 0
+            if not receiving:
+                # Looking for start bit (0)
+                if bit == 0 and (last_bit == 1 or last_bit is None):
+                    receiving = True
+                    frame = 0  # Start bit
+                    bit_count = 1
+                    if debug_mode:
+                        print("Start bit detected - beginning character reception")
+            else:
+                # Shift bit into the frame register
+                frame = (frame >> 1) | (bit << 9)
+                bit_count += 1
                 
-        self.last_bit = bit
+                # Check if we have a complete character (10 bits)
+                if bit_count == 10:
+                    self.frame = frame
+                    self.decode_character()
+                    frame = self.frame
+                    receiving = False
+                    bit_count = 0
+                    
+            last_bit = bit
+        
+        self.last_bit = last_bit
+        self.last_transition = last_transition
+        self.receiving = receiving
+        self.frame = frame
+        self.bit_count = bit_count
     
     def decode_character(self):
         """Decode 10 bits (start bit + 8 data bits + stop bit) to ASCII character"""
-        # Check if start and stop bits are valid
-        if self.bit_buffer[0] != 0 or self.bit_buffer[9] != 1:
+        frame = self.frame
+        
+        # Check if start and stop bits are valid (start=0 in bit 0, stop=1 in bit 9)
+        if (frame & 0x201) != 0x200:
             # Invalid framing
             if self.debug_mode:
-                print(f"Invalid framing bits: start={self.bit_buffer[0]}, stop={self.bit_buffer[9]}")
-            self.bit_buffer = []
+                print(f"Invalid framing bits: start={frame & 1}, stop={frame >> 9}")
+            self.frame = 0
             return
             
-        # Extract the 8 data bits and convert to decimal
-        ascii_val = 0
-        for i in range(8):
-            if self.bit_buffer[i+1] == 1:
-                ascii_val |= (1 << i)
+        # The 8 data bits sit between the framing bits, LSB first
+        ascii_val = (frame >> 1) & 0xFF
         
         # Convert to character and add to buffer
         char = chr(ascii_val)
-        self.char_buffer += char
+        self.char_buffer.append(ascii_val)
         
         if self.debug_mode:
             print(f"Decoded character: '{char}' ({ascii_val})")
         
         # Check for packet pattern
-        if char == '*' or "TEMP:" in self.char_buffer or "TEST:" in self.char_buffer:
+        if ascii_val == 0x2A or b"TEMP:" in self.char_buffer or b"TEST:" in self.char_buffer:  # '*'
             self.packet_buffer += self.char_buffer
-            self.char_buffer = ""
+            self.char_buffer.clear()
             self.check_packet()
     
     def check_packet(self):
         """Check if we have a complete packet and extract data"""
+        # Every packet ends in '*' and a checksum, so there is nothing to
+        # match until a '*' has arrived
+        has_terminator = b"*" in self.packet_buffer
+        
         # Check for temperature pattern
-        temp_match = re.search(r'TEMP:([\d.]+)\*([0-9A-F]{2})', self.packet_buffer)
+        temp_match = has_terminator and find_packet(TEMP_RE, b"TEMP:", self.packet_buffer)
         if temp_match:
-            temp_str = temp_match.group(1)
-            checksum_str = temp_match.group(2)
+            temp_str = temp_match.group(1).decode('ascii')
+            checksum_str = temp_match.group(2).decode('ascii')
             
             # Verify checksum
-            calculated_checksum = sum(ord(c) for c in f"TEMP:{temp_str}") % 256
+            calculated_checksum = sum(b"TEMP:" + temp_match.group(1)) & 0xFF
             received_checksum = int(checksum_str, 16)
             
             if calculated_checksum == received_checksum:
@@ -133,17 +183,17 @@ class AFSKReceiver:
                 print(f"\nChecksum error! Received: {checksum_str}, Calculated: {calculated_checksum:02X}")
             
             # Reset packet buffer but keep anything after the matched pattern
-            self.packet_buffer = self.packet_buffer[temp_match.end():]
+            del self.packet_buffer[:temp_match.end()]
             return
             
         # Check for test message pattern
-        test_match = re.search(r'TEST:([A-Z]+)\*([0-9A-F]{2})', self.packet_buffer)
+        test_match = has_terminator and find_packet(TEST_RE, b"TEST:", self.packet_buffer)
         if test_match:
-            message = test_match.group(1)
-            checksum_str = test_match.group(2)
+            message = test_match.group(1).decode('ascii')
+            checksum_str = test_match.group(2).decode('ascii')
             
             # Verify checksum
-            calculated_checksum = sum(ord(c) for c in f"TEST:{message}") % 256
+            calculated_checksum = sum(b"TEST:" + test_match.group(1)) & 0xFF
             received_checksum = int(checksum_str, 16)
             
             if calculated_checksum == received_checksum:
@@ -152,16 +202,63 @@ class AFSKReceiver:
                 print(f"\nTest message checksum error! Received: {checksum_str}, Calculated: {calculated_checksum:02X}")
                 
             # Reset packet buffer but keep anything after the matched pattern
-            self.packet_buffer = self.packet_buffer[test_match.end():]
+            del self.packet_buffer[:test_match.end()]
             return
         
         # If buffer gets too long without matching, trim it
         elif len(self.packet_buffer) > 100:
             if self.debug_mode:
                 print("Trimming packet buffer (too long without match)")
-            self.packet_buffer = self.packet_buffer[-50:]  # Keep last 50 chars
+            del self.packet_buffer[:-50]  # Keep last 50 chars
+
+class ChunkRing:
+    """Fixed ring of audio chunks from the PyAudio callback to the processing thread.
+    
+    Single producer, single consumer: only the callback moves head and only
+    the processing thread moves tail, so neither side takes a lock.
+    """
+    
+    def __init__(self, num_chunks=AUDIO_BUFFER_CHUNKS, chunk_size=CHUNK_SIZE):
+        self.chunks = np.zeros((num_chunks, chunk_size), dtype=np.float32)
+        self.lengths = [0] * num_chunks
+        self.head = 0  # Chunks written
+        self.tail = 0  # Chunks released by the reader
+        self.holding = False  # Reader still using the chunk at tail
+        self.data_ready = threading.Event()
+        self.closed = False
+        self.dropped = 0
+        
+    def put(self, data):
+        """Copy one chunk in; drops it if the reader is a whole ring behind"""
+        if self.head - self.tail >= len(self.chunks):
+            self.dropped += 1
+            return
+        slot = self.head % len(self.chunks)
+        n = min(len(data), self.chunks.shape[1])
+        self.chunks[slot, :n] = data[:n]
+        self.lengths[slot] = n
+        self.head += 1
+        self.data_ready.set()
+        
+    def get(self, timeout=None):
+        """Next chunk as a view into the ring, valid until the next get; None on timeout or close"""
+        if self.holding:
+            self.tail += 1
+            self.holding = False
+        while self.tail == self.head:
+            if self.closed or not self.data_ready.wait(timeout):
+                return None
+            self.data_ready.clear()
+        slot = self.tail % len(self.chunks)
+        self.holding = True
+        return self.chunks[slot, :self.lengths[slot]]
+        
+    def close(self):
+        """Wake the reader and make it stop"""
+        self.closed = True
+        self.data_ready.set()
 
-def audio_callback(in_data, frame_count, time_info, status, audio_queue):
+def audio_callback(in_data, frame_count, time_info, status, audio_ring):
     """Callback for PyAudio"""
     if status:
         print(f"Status: {status}")
@@ -169,55 +266,54 @@ def audio_callback(in_data, frame_count, time_info, status, audio_queue):
     # Convert byte data to numpy array
     audio_data = np.frombuffer(in_data, dtype=np.float32)
     
-    # Add to queue
-    audio_queue.put(audio_data)
+    # Copy into the ring; never blocks the audio thread
+    audio_ring.put(audio_data)
     
     return (in_data, pyaudio.paContinue)
 
 def process_audio_data(audio_data, receiver):
     """Process a chunk of audio data for AFSK decoding"""
-    # Get maximum level for display
-    level = np.max(np.abs(audio_data))
+    # Get maximum level for display, without an abs() copy of the chunk
+    level = max(audio_data.max(), -audio_data.min())
     
-    # Process the chunk in bit-sized segments
-    for i in range(0, len(audio_data), SAMPLES_PER_BIT):
-        if i + SAMPLES_PER_BIT > len(audio_data):
-            break  # Not enough samples for a full bit
-            
-        # Get a chunk of samples that represents one bit
-        bit_chunk = audio_data[i:i+SAMPLES_PER_BIT]
-        
-        # Apply bandpass filters
-        mark_signal = signal.lfilter(MARK_FILTER[0], MARK_FILTER[1], bit_chunk)
-        space_signal = signal.lfilter(SPACE_FILTER[0], SPACE_FILTER[1], bit_chunk)
-        
-        # Calculate energy in the filtered signals
-        mark_energy = np.sum(np.abs(mark_signal) ** 2)
-        space_energy = np.sum(np.abs(space_signal) ** 2)
-        
-        # Determine bit based on which frequency has more energy
-        bit = 1 if mark_energy > space_energy else 0
-        
-        # Process the bit
-        receiver.process_bit(bit)
+    # Chunks are not a whole number of bits long; continue from the partial
+    # bit the last chunk ended on so bit timing doesn't slip every chunk
+    samples = receiver.sample_buffer
+    total = receiver.pending + len(audio_data)
+    samples[receiver.pending:total] = audio_data
+    
+    # Tone powers for every whole bit in the chunk in one pass, into the
+    # receiver's scratch rather than fresh arrays
+    num_bits = total // SAMPLES_PER_BIT
+    whole_bits = num_bits * SAMPLES_PER_BIT
+    bit_chunks = samples[:whole_bits].reshape(num_bits, SAMPLES_PER_BIT)
+    mark_energy, space_energy = goertzel_power(bit_chunks, out=receiver.proj_buffer[:num_bits]).T
+    
+    # Move the new partial bit to the front for the next chunk
+    samples[:total - whole_bits] = samples[whole_bits:total]
+    receiver.pending = total - whole_bits
+    
+    # Determine bits based on which frequency has more energy, then feed
+    # them through the framing state machine
+    receiver.process_bits((mark_energy > space_energy).astype(np.uint8).tolist())
     
     return level
 
-def processing_thread(audio_queue, receiver, level_queue):
-    """Thread to process audio data from queue"""
+def processing_thread(audio_ring, receiver, level_queue):
+    """Thread to process audio data from the ring"""
     while True:
         try:
-            chunk = audio_queue.get(timeout=1.0)
-            if chunk is None:  # Special value to signal thread to exit
-                break
+            chunk = audio_ring.get(timeout=1.0)
+            if chunk is None:
+                if audio_ring.closed:  # Receiver is shutting down
+                    break
+                continue  # Just continue if no data
             
             level = process_audio_data(chunk, receiver)
-            level_queue.put(level)
-            
-            audio_queue.task_done()
-        except queue.Empty:
-            # Just continue if no data
-            continue
+            try:
+                level_queue.put_nowait(level)
+            except queue.Full:
+                pass  # Display is behind; it only needs the latest levels
         except Exception as e:
             print(f"Error in processing thread: {str(e)}")
 
@@ -237,11 +333,11 @@ def main():
     # Initialize the receiver
     receiver = AFSKReceiver()
     receiver.set_debug(debug_mode)
-    audio_queue = queue.Queue(maxsize=10)
+    audio_ring = ChunkRing()
     level_queue = queue.Queue(maxsize=10)
     
     # Create and start processing thread
-    proc_thread = threading.Thread(target=processing_thread, args=(audio_queue, receiver, level_queue))
+    proc_thread = threading.Thread(target=processing_thread, args=(audio_ring, receiver, level_queue))
     proc_thread.daemon = True
     proc_thread.start()
     
@@ -271,7 +367,7 @@ def main():
                         frames_per_buffer=CHUNK_SIZE,
                         input_device_index=device_index if device_index is not None else None,
                         stream_callback=lambda in_data, frame_count, time_info, status: 
-                                       audio_callback(in_data, frame_count, time_info, status, audio_queue))
+                                       audio_callback(in_data, frame_count, time_info, status, audio_ring))
         
         print("\nAudio input opened. Listening for AFSK signals...")
         print("Press Ctrl+C to stop.")
@@ -308,7 +404,7 @@ def main():
             stream.close()
         
         # Signal processing thread to exit
-        audio_queue.put(None)
+        audio_ring.close()
         proc_thread.join(timeout=1.0)
         
         p.terminate()
@@ -20,6 +20,9 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
 from PyQt5.QtCore import Qt, pyqtSignal, QThread
 from PyQt5.QtGui import QFont
 
+# Samples in one cycle of the tone wavetable (a power of two, so phase wraps with a mask)
+WAVETABLE_SIZE = 4096
+
 
 class MorseCode:
     """Morse code utility class for encoding."""
@@ -116,32 +119,47 @@ class MorseAudioGenerator:
         self.volume = volume
         self.p = pyaudio.PyAudio()
         self.stream = None
+        self._silence = np.zeros(0, dtype=np.float32)  # Shared zero buffer for gaps
+        # One sine cycle, looked up by phase instead of calling np.sin per tone
+        self._wavetable = np.sin(2 * np.pi * np.arange(WAVETABLE_SIZE) / WAVETABLE_SIZE).astype(np.float32)
     
     def generate_tone(self, duration):
         """Generate a sine wave tone of the given duration in seconds."""
-        t = np.linspace(0, duration, int(self.sample_rate * duration), False)
+        n_samples = int(self.sample_rate * duration)
         # Apply a slight fade in/out to avoid clicks
         fade_duration = min(0.01, duration / 10)
         fade_samples = int(fade_duration * self.sample_rate)
         
-        # Generate the base tone
-        tone = np.sin(2 * np.pi * self.tone_frequency * t)
+        # Generate the base tone: a phase accumulator in table steps, wrapped
+        # to the table size, indexes the wavetable
+        step = self.tone_frequency * WAVETABLE_SIZE / self.sample_rate
+        phase = (np.arange(n_samples) * step).astype(np.int64)
+        phase &= WAVETABLE_SIZE - 1
+        tone = self._wavetable[phase]
         
         # Apply fade in
         if fade_samples > 0:
-            fade_in = np.linspace(0, 1, fade_samples)
+            fade_in = np.linspace(0, 1, fade_samples, dtype=np.float32)
             tone[:fade_samples] *= fade_in
             
             # Apply fade out
-            fade_out = np.linspace(1, 0, fade_samples)
-            tone[-fade_samples:] *= fade_out
+            tone[-fade_samples:] *= fade_in[::-1]
         
         # Scale by volume
-        return (tone * self.volume).astype(np.float32)
+        tone *= np.float32(self.volume)
+        return tone
     
     def generate_silence(self, duration):
-        """Generate silence of the given duration in seconds."""
-        return np.zeros(int(self.sample_rate * duration), dtype=np.float32)
+        """Generate silence of the given duration in seconds.
+        
+        Returns a read-only view into one cached zero buffer, which only
+        grows when a longer gap than any before is requested.
+        """
+        n_samples = int(self.sample_rate * duration)
+        if n_samples > self._silence.size:
+            self._silence = np.zeros(n_samples, dtype=np.float32)
+            self._silence.flags.writeable = False
+        return self._silence[:n_samples]
     
     def start_stream(self):
         """Open the audio output stream."""
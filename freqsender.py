@@ -30,6 +30,12 @@ except serial.SerialException:
 DOT_FREQUENCY = 800  # Frequency for dots
 DASH_FREQUENCY = 600  # Frequency for dashes
 
+# Serial commands are built directly as bytes; the stop command never changes
+STOP_COMMAND = b"SIGNAL 0\r\n"
+
+def signal_command(frequency):
+    return b"SIGNAL %d\r\n" % frequency
+
 # Convert text to Morse Code
 def text_to_morse(text):
     debug_log(f"Converting text to Morse Code: {text}")
@@ -72,7 +78,7 @@ def send_signal(frequency, duration):
     debug_log(f"Sending signal: Frequency={frequency}Hz, Duration={duration}s")
     
     # Send frequency data via serial
-    ser.write(f"SIGNAL {frequency}\r\n".encode())
+    ser.write(signal_command(frequency))
     ser.flush()
     
     # Hold for specified duration
@@ -80,7 +86,7 @@ def send_signal(frequency, duration):
     
     # Stop transmission
     debug_log("Sending STOP signal")
-    ser.write(f"SIGNAL 0\r\n".encode())
+    ser.write(STOP_COMMAND)
     ser.flush()
     time.sleep(0.1)  # Ensure the stop command is processed
 
@@ -91,7 +97,7 @@ if __name__ == "__main__":
         debug_log("Program completed successfully.")
     finally:
         debug_log("Stopping any ongoing transmissions before closing...")
-        ser.write(f"SIGNAL 0\r\n".encode())
+        ser.write(STOP_COMMAND)
         ser.flush()
         time.sleep(0.5)
         
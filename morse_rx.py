@@ -68,7 +68,7 @@ class SimpleMorseReceiver:
         nyquist = 0.5 * sample_rate
         low = (TONE_FREQ - 100) / nyquist  # Wider filter bandwidth
         high = (TONE_FREQ + 100) / nyquist
-        self.bandpass_filter = signal.butter(2, [low, high], btype='band')
+        self.bandpass_sos = signal.butter(2, [low, high], btype='band', output='sos')
         
         print(f"Receiver initialized with:")
         print(f"- Tone frequency: {TONE_FREQ} Hz")
@@ -163,51 +163,46 @@ class SimpleMorseReceiver:
         word_gap_samples = int(self.word_gap * self.sample_rate * 0.8)
         
         morse_pattern = []
-        in_tone = False
-        tone_start = 0
         last_tone_end = 0
-        gap_start = 0
         
         # Apply adaptive threshold
         threshold = max(self.noise_floor, np.mean(envelope) * 0.3)
         
-        # Process the envelope
-        i = 0
-        while i < len(envelope):
+        # Walk only the threshold crossings; edges alternate rising/falling
+        edges = np.flatnonzero(np.diff(envelope > threshold, prepend=False)).tolist()
+        for k in range(0, len(edges), 2):
             # Rising edge detection
-            if not in_tone and envelope[i] > threshold:
-                in_tone = True
-                tone_start = i
-                gap_duration = i - last_tone_end if last_tone_end > 0 else 0
-                
-                # Check if we should add a letter or word gap
-                if gap_duration >= word_gap_samples:
-                    morse_pattern.append('/')
-                    if DEBUG_MODE:
-                        print("/", end='', flush=True)
-                elif gap_duration >= letter_gap_samples:
-                    morse_pattern.append(' ')
-                    if DEBUG_MODE:
-                        print(" ", end='', flush=True)
+            i = edges[k]
+            tone_start = i
+            gap_duration = i - last_tone_end if last_tone_end > 0 else 0
             
-            # Falling edge detection
-            elif in_tone and envelope[i] <= threshold:
-                in_tone = False
-                tone_duration = i - tone_start
-                last_tone_end = i
-                
-                # Classify as dot or dash
-                if tone_duration >= dot_samples:
-                    if tone_duration < dash_samples:
-                        morse_pattern.append('.')
-                        if DEBUG_MODE:
-                            print(".", end='', flush=True)
-                    else:
-                        morse_pattern.append('-')
-                        if DEBUG_MODE:
-                            print("-", end='', flush=True)
+            # Check if we should add a letter or word gap
+            if gap_duration >= word_gap_samples:
+                morse_pattern.append('/')
+                if DEBUG_MODE:
+                    print("/", end='', flush=True)
+            elif gap_duration >= letter_gap_samples:
+                morse_pattern.append(' ')
+                if DEBUG_MODE:
+                    print(" ", end='', flush=True)
             
-            i += 1
+            # Falling edge detection (a tone still on at the end is left open)
+            if k + 1 == len(edges):
+                break
+            i = edges[k + 1]
+            tone_duration = i - tone_start
+            last_tone_end = i
+            
+            # Classify as dot or dash
+            if tone_duration >= dot_samples:
+                if tone_duration < dash_samples:
+                    morse_pattern.append('.')
+                    if DEBUG_MODE:
+                        print(".", end='', flush=True)
+                else:
+                    morse_pattern.append('-')
+                    if DEBUG_MODE:
+                        print("-", end='', flush=True)
             
         if DEBUG_MODE and len(morse_pattern) > 0:
             print()  # New line after dots and dashes
@@ -231,7 +226,7 @@ class SimpleMorseReceiver:
             buffer_array = np.array(self.buffer)
             
             # Apply bandpass filter to isolate tone frequency
-            filtered = signal.filtfilt(self.bandpass_filter[0], self.bandpass_filter[1], buffer_array)
+            filtered = signal.sosfiltfilt(self.bandpass_sos, buffer_array)
             
             # Calculate envelope for tone detection
             analytic_signal = signal.hilbert(filtered)
@@ -1,5 +1,6 @@
 import numpy as np
 import scipy.signal as signal
+import scipy.fft as sp_fft
 import pyaudio
 
 # Constants
@@ -7,10 +8,12 @@ MARK_FREQ = 1200  # Hz
 SPACE_FREQ = 2200  # Hz
 BAUD_RATE = 1200  # bits per second
 SAMPLE_RATE = 44100  # Audio sampling rate
+SAMPLES_PER_BIT = SAMPLE_RATE // BAUD_RATE
 BUFFER_SIZE = 1024  # Audio buffer
 
 # Pre-emphasis filter coefficients
-PRE_EMPHASIS_COEFFS = [1, -0.95]
+PRE_EMPHASIS_COEFFS = np.array([1, -0.95], dtype=np.float32)
+FIR_DENOMINATOR = np.ones(1, dtype=np.float32)  # lfilter's 'a' for FIR filters; float32 so nothing upcasts to float64
 
 # FIR filter design for band-pass filters
 def design_bandpass_filter(center_freq, bandwidth, num_taps, sample_rate):
@@ -19,6 +22,21 @@ def design_bandpass_filter(center_freq, bandwidth, num_taps, sample_rate):
     high = (center_freq + bandwidth / 2) / nyquist
     return signal.firwin(num_taps, [low, high], pass_zero=False)
 
+# The band-pass taps never change, so design them once
+MARK_TAPS = design_bandpass_filter(MARK_FREQ, 400, 101, SAMPLE_RATE).astype(np.float32)
+SPACE_TAPS = design_bandpass_filter(SPACE_FREQ, 400, 101, SAMPLE_RATE).astype(np.float32)
+
+# FIR filtering through the frequency domain: one forward FFT of the signal
+# is shared by both filters. Same output as lfilter(taps, 1, sig), but
+# O(N log N) instead of a 101-tap multiply-accumulate per sample
+def fft_filter_pair(sig, taps_a, taps_b):
+    n = len(sig)
+    nfft = sp_fft.next_fast_len(n + max(len(taps_a), len(taps_b)) - 1, real=True)
+    spectrum = sp_fft.rfft(sig, nfft)
+    out_a = sp_fft.irfft(spectrum * sp_fft.rfft(taps_a, nfft), nfft)[:n]
+    out_b = sp_fft.irfft(spectrum * sp_fft.rfft(taps_b, nfft), nfft)[:n]
+    return out_a, out_b
+
 # Hilbert Transform for quadrature component
 def hilbert_transform(sig):
     analytic_signal = signal.hilbert(sig)
@@ -27,41 +45,34 @@ def hilbert_transform(sig):
 # AFSK Demodulation
 def afsk_demodulate(received_signal):
     # Apply pre-emphasis filter
-    emphasized_signal = signal.lfilter(PRE_EMPHASIS_COEFFS, 1, received_signal)
+    emphasized_signal = signal.lfilter(PRE_EMPHASIS_COEFFS, FIR_DENOMINATOR, received_signal)
 
     # Generate quadrature signal
     quadrature_signal = hilbert_transform(emphasized_signal)
 
-    # Design band-pass filters
-    mark_filter = design_bandpass_filter(MARK_FREQ, 400, 101, SAMPLE_RATE)
-    space_filter = design_bandpass_filter(SPACE_FREQ, 400, 101, SAMPLE_RATE)
-
     # Apply filters
-    mark_signal = signal.lfilter(mark_filter, 1, emphasized_signal)
-    space_signal = signal.lfilter(space_filter, 1, emphasized_signal)
+    mark_signal, space_signal = fft_filter_pair(emphasized_signal, MARK_TAPS, SPACE_TAPS)
 
     # Envelope detection
     mark_envelope = np.abs(signal.hilbert(mark_signal))
     space_envelope = np.abs(signal.hilbert(space_signal))
 
-    # Bit decision
-    bitstream = []
-    samples_per_bit = SAMPLE_RATE // BAUD_RATE
-    for i in range(0, len(received_signal), samples_per_bit):
-        mark_power = np.sum(mark_envelope[i:i + samples_per_bit])
-        space_power = np.sum(space_envelope[i:i + samples_per_bit])
-        bitstream.append(1 if mark_power > space_power else 0)
+    # Bit decision: sum each envelope over every bit period at once (the
+    # last period may be partial) instead of one slice per bit
+    bit_starts = np.arange(0, len(received_signal), SAMPLES_PER_BIT)
+    mark_power = np.add.reduceat(mark_envelope, bit_starts)
+    space_power = np.add.reduceat(space_envelope, bit_starts)
+    bitstream = np.greater(mark_power, space_power).view(np.uint8)  # 1 byte per bit, no copy
 
     return bitstream
 
 # Convert bitstream to text
 def bitstream_to_text(bitstream):
-    chars = []
-    for i in range(0, len(bitstream), 8):
-        byte = bitstream[i:i + 8]
-        if len(byte) == 8:
-            chars.append(chr(int(''.join(map(str, byte)), 2)))
-    return ''.join(chars)
+    # Pack every complete 8-bit group (MSB first) at once; latin-1 maps each
+    # byte to the same character chr() would
+    bits = np.asarray(bitstream, dtype=np.uint8)
+    bits = bits[:len(bits) - len(bits) % 8]
+    return np.packbits(bits).tobytes().decode('latin-1')
 
 # Record audio signal from mic
 def record_signal(duration):
@@ -83,7 +94,7 @@ def record_signal(duration):
     stream.close()
     p.terminate()
     
-    return np.concatenate(frames) / 32768.0  # Normalize [-1,1]
+    return np.concatenate(frames) * np.float32(1.0 / 32768.0)  # Normalize [-1,1], staying float32
 
 # Main function for receiving
 if __name__ == "__main__":
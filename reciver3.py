@@ -9,10 +9,14 @@ MARK_FREQ = 1200  # Hz
 SPACE_FREQ = 2200  # Hz
 BAUD_RATE = 1200  # Bits per second
 SAMPLE_RATE = 44100  # Audio sampling rate
-BUFFER_SIZE = 1024  # Buffer for real-time processing
+SAMPLES_PER_BIT = SAMPLE_RATE // BAUD_RATE
+# Samples per read: 16 whole characters of bits (~0.1 s), so each read ends
+# on a bit and byte boundary and the next one carries on in step
+BUFFER_SIZE = SAMPLES_PER_BIT * 8 * 16
 
 # Pre-emphasis filter coefficients
-PRE_EMPHASIS_COEFFS = [1, -0.95]
+PRE_EMPHASIS_COEFFS = np.array([1, -0.95], dtype=np.float32)
+FIR_DENOMINATOR = np.ones(1, dtype=np.float32)  # lfilter's 'a' for FIR filters; float32 so nothing upcasts to float64
 
 # Band-pass filter design
 def design_bandpass_filter(center_freq, bandwidth, num_taps, sample_rate):
@@ -21,48 +25,60 @@ def design_bandpass_filter(center_freq, bandwidth, num_taps, sample_rate):
     high = (center_freq + bandwidth / 2) / nyquist
     return signal.firwin(num_taps, [low, high], pass_zero=False)
 
+# The band-pass taps never change, so design them once
+MARK_TAPS = design_bandpass_filter(MARK_FREQ, 400, 101, SAMPLE_RATE).astype(np.float32)
+SPACE_TAPS = design_bandpass_filter(SPACE_FREQ, 400, 101, SAMPLE_RATE).astype(np.float32)
+
+# Filter delay lines, carried from one chunk to the next so every chunk
+# continues the previous one instead of starting from silence. Both band-pass
+# filters share one history: the last len(taps) - 1 emphasized samples
+def new_filter_state():
+    return {
+        'emphasis': np.zeros(len(PRE_EMPHASIS_COEFFS) - 1, dtype=np.float32),
+        'history': np.zeros(len(MARK_TAPS) - 1, dtype=np.float32),
+    }
+
 # Hilbert Transform for quadrature demodulation
 def hilbert_transform(sig):
     analytic_signal = signal.hilbert(sig)
     return np.imag(analytic_signal)
 
 # AFSK Demodulation
-def afsk_demodulate(received_signal):
+def afsk_demodulate(received_signal, state):
     # Apply pre-emphasis filter
-    emphasized_signal = signal.lfilter(PRE_EMPHASIS_COEFFS, 1, received_signal)
+    emphasized_signal, state['emphasis'] = signal.lfilter(PRE_EMPHASIS_COEFFS, FIR_DENOMINATOR, received_signal, zi=state['emphasis'])
 
     # Generate quadrature component
     quadrature_signal = hilbert_transform(emphasized_signal)
 
-    # Band-pass filtering for mark & space
-    mark_filter = design_bandpass_filter(MARK_FREQ, 400, 101, SAMPLE_RATE)
-    space_filter = design_bandpass_filter(SPACE_FREQ, 400, 101, SAMPLE_RATE)
-
-    mark_signal = signal.lfilter(mark_filter, 1, emphasized_signal)
-    space_signal = signal.lfilter(space_filter, 1, emphasized_signal)
+    # Band-pass filtering for mark & space. The taps are FIR, so a direct
+    # 'valid' convolution over history + chunk gives the same samples as
+    # lfilter with carried state, on numpy's vectorized dot-product loop
+    extended = np.concatenate((state['history'], emphasized_signal))
+    mark_signal = np.convolve(extended, MARK_TAPS, mode='valid')
+    space_signal = np.convolve(extended, SPACE_TAPS, mode='valid')
+    state['history'] = extended[len(extended) - len(state['history']):]
 
     # Envelope detection
     mark_envelope = np.abs(signal.hilbert(mark_signal))
     space_envelope = np.abs(signal.hilbert(space_signal))
 
-    # Bit detection
-    bitstream = []
-    samples_per_bit = SAMPLE_RATE // BAUD_RATE
-    for i in range(0, len(received_signal), samples_per_bit):
-        mark_power = np.sum(mark_envelope[i:i + samples_per_bit])
-        space_power = np.sum(space_envelope[i:i + samples_per_bit])
-        bitstream.append(1 if mark_power > space_power else 0)
+    # Bit decision: sum each envelope over every bit period at once (the
+    # last period may be partial) instead of one slice per bit
+    bit_starts = np.arange(0, len(received_signal), SAMPLES_PER_BIT)
+    mark_power = np.add.reduceat(mark_envelope, bit_starts)
+    space_power = np.add.reduceat(space_envelope, bit_starts)
+    bitstream = np.greater(mark_power, space_power).view(np.uint8)  # 1 byte per bit, no copy
 
     return bitstream
 
 # Convert bitstream to text
 def bitstream_to_text(bitstream):
-    chars = []
-    for i in range(0, len(bitstream), 8):
-        byte = bitstream[i:i + 8]
-        if len(byte) == 8:
-            chars.append(chr(int(''.join(map(str, byte)), 2)))
-    return ''.join(chars)
+    # Pack every complete 8-bit group (MSB first) at once; latin-1 maps each
+    # byte to the same character chr() would
+    bits = np.asarray(bitstream, dtype=np.uint8)
+    bits = bits[:len(bits) - len(bits) % 8]
+    return np.packbits(bits).tobytes().decode('latin-1')
 
 # Real-time AFSK receiver function
 def real_time_receiver():
@@ -74,15 +90,16 @@ def real_time_receiver():
                     frames_per_buffer=BUFFER_SIZE)
     
     print("Listening for incoming AFSK signals... Press Ctrl+C to stop.")
+    filter_state = new_filter_state()
 
     try:
         while True:
             # Read incoming audio
             audio_data = np.frombuffer(stream.read(BUFFER_SIZE, exception_on_overflow=False), dtype=np.int16)
-            audio_signal = audio_data / 32768.0  # Normalize to [-1,1]
+            audio_signal = audio_data * np.float32(1.0 / 32768.0)  # Normalize to [-1,1], staying float32
 
             # Demodulate AFSK signal
-            bitstream = afsk_demodulate(audio_signal)
+            bitstream = afsk_demodulate(audio_signal, filter_state)
 
             # Convert bits to text and print live output
             message = bitstream_to_text(bitstream)
@@ -1,8 +1,7 @@
 import numpy as np
 import sounddevice as sd
-import queue
+import threading
 import time
-from datetime import datetime, timezone
 
 MORSE_CODE_REVERSED = {
     # Optimized number decoding
@@ -22,82 +21,151 @@ MORSE_CODE_REVERSED = {
     '..--': '_'
 }
 
+# Integer-coded lookup: a symbol of n elements is (n << 6) | dash_bits,
+# dash_bits having bit i set when element i is a dash, so the symbol being
+# received is two ints instead of a growing string
+MAX_SYMBOL_LEN = 6
+
+def symbol_code(symbol):
+    code = len(symbol) << 6
+    for i, c in enumerate(symbol):
+        if c == '-':
+            code |= 1 << i
+    return code
+
+_table = [''] * ((MAX_SYMBOL_LEN + 1) << 6)
+for _symbol, _char in MORSE_CODE_REVERSED.items():
+    if _symbol and not _symbol.strip('.-'):
+        _table[symbol_code(_symbol)] = _char
+MORSE_TABLE = tuple(_table)
+del _table
+
 samplerate = 44100
 threshold = 0.05
 dot_duration = 0.12
-q = queue.Queue()
+blocksize = 1024
+
+# Ring buffer filled by the audio callback. ring_head counts every sample
+# ever written; the decode loop keeps its own read position.
+RING_SIZE = 1 << 16  # ~1.5 s, a whole number of blocks
+ring = np.empty(RING_SIZE, dtype=np.float32)
+ring_head = 0
+data_ready = threading.Event()
+
+def rms2(d):
+    """Mean square of a block (RMS squared) via a single dot product."""
+    return (d @ d) / d.size
+
+def utc_timestamp():
+    """Current UTC time as ISO 8601 to the second, e.g. 2025-01-31T00:00:00+00:00."""
+    tm = time.gmtime()
+    return (f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+            f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}+00:00")
 
 def audio_callback(indata, frames, time, status):
-    q.put(indata.copy())
+    # Copy straight into the ring: no allocation or lock on the audio thread
+    global ring_head
+    start = ring_head % RING_SIZE
+    end = start + frames
+    if end <= RING_SIZE:
+        np.copyto(ring[start:end], indata[:, 0])
+    else:
+        split = RING_SIZE - start
+        np.copyto(ring[start:], indata[:split, 0])
+        np.copyto(ring[:end - RING_SIZE], indata[split:, 0])
+    ring_head += frames
+    data_ready.set()
 
 def listen_and_decode():
-    current_symbol = ''
+    symbol_len = 0    # elements in the current symbol
+    symbol_bits = 0   # dash bits of the current symbol
     message_buffer = ''
     last_activity = time.time()
     in_signal = False
     receiving_message = False
     last_print_len = 0  # Track previous message length
 
-    with sd.InputStream(callback=audio_callback, channels=1, samplerate=samplerate):
+    # Loop invariants as locals: the per-block path does no global or
+    # attribute lookups and no repeated arithmetic on constants
+    now = time.time
+    wait_for_data = data_ready.wait
+    clear_ready = data_ready.clear
+    tail = 0  # read position in the ring, always a whole number of blocks
+    threshold_sq = threshold * threshold
+    dash_min = 1.5 * dot_duration
+    char_gap = 3 * dot_duration
+    word_gap = 7 * dot_duration
+
+    with sd.InputStream(callback=audio_callback, channels=1, samplerate=samplerate, blocksize=blocksize, dtype='float32'):
         print("Listening for sensor data...")
         while True:
             # Message completion check (2 seconds of silence)
-            if receiving_message and (time.time() - last_activity) > 2:
+            if receiving_message and (now() - last_activity) > 2:
                 process_message(message_buffer)
                 message_buffer = ''
-                current_symbol = ''
+                symbol_len = 0
+                symbol_bits = 0
                 receiving_message = False
                 print("\nReady for new transmission...")
 
-            try:
-                data = q.get_nowait().flatten()
-                rms = np.sqrt(np.mean(np.square(data)))
+            available = ring_head - tail
+            if available < blocksize:
+                wait_for_data(0.1)  # Woken by the next block, no fixed poll
+                clear_ready()
+                continue
+            if available > RING_SIZE:
+                # Fell a whole ring behind; skip ahead to recent audio
+                tail = ring_head - RING_SIZE // 2
+                tail -= tail % blocksize
+            
+            # Blocks never straddle the end of the ring: it holds a whole number of them
+            start = tail % RING_SIZE
+            data = ring[start:start + blocksize]
+            tail += blocksize
+            loud = rms2(data) > threshold_sq
+            
+            if loud and not in_signal:
+                in_signal = True
+                signal_start = now()
+                last_activity = signal_start
                 
-                if rms > threshold and not in_signal:
-                    in_signal = True
-                    signal_start = time.time()
-                    last_activity = signal_start
+                # Detect message start
+                if not receiving_message:
+                    receiving_message = True
+                    message_buffer = ''
                     
-                    # Detect message start
-                    if not receiving_message:
-                        receiving_message = True
-                        message_buffer = ''
-                        
-                elif rms <= threshold and in_signal:
-                    in_signal = False
-                    signal_duration = time.time() - signal_start
-                    last_activity = time.time()
-                    
-                    # Symbol detection
-                    if signal_duration < 1.5*dot_duration:
-                        current_symbol += '.'
-                    else:
-                        current_symbol += '-'
-                        
-                # Character/word space detection
-                if not in_signal:
-                    silence_duration = time.time() - last_activity
-                    
-                    # Word space handling
-                    if silence_duration > 7*dot_duration and message_buffer:
-                        message_buffer += ' '
-                        # Clear previous line completely
-                        print(' ' * last_print_len, end='\r')
-                        print(f"Receiving: {message_buffer}", end='\r')
-                        last_print_len = len(message_buffer) + 10
+            elif not loud and in_signal:
+                in_signal = False
+                last_activity = now()
+                signal_duration = last_activity - signal_start
+                
+                # Symbol detection: shift in a dash bit (0 = dot)
+                symbol_bits |= (signal_duration >= dash_min) << symbol_len
+                symbol_len += 1
                     
-                    # Character space handling
-                    elif silence_duration > 3*dot_duration and current_symbol:
-                        char = MORSE_CODE_REVERSED.get(current_symbol, '')
-                        message_buffer += char
-                        current_symbol = ''
-                        # Clear previous line completely
-                        print(' ' * last_print_len, end='\r')
-                        print(f"Receiving: {message_buffer}", end='\r')
-                        last_print_len = len(message_buffer) + 10
-
-            except queue.Empty:
-                time.sleep(0.01)
+            # Character/word space detection
+            if not in_signal:
+                silence_duration = now() - last_activity
+                
+                # Word space handling
+                if silence_duration > word_gap and message_buffer:
+                    message_buffer += ' '
+                    # Clear previous line completely
+                    print(' ' * last_print_len, end='\r')
+                    print(f"Receiving: {message_buffer}", end='\r')
+                    last_print_len = len(message_buffer) + 10
+                
+                # Character space handling
+                elif silence_duration > char_gap and symbol_len:
+                    if symbol_len <= MAX_SYMBOL_LEN:
+                        message_buffer += MORSE_TABLE[(symbol_len << 6) | symbol_bits]
+                    symbol_len = 0
+                    symbol_bits = 0
+                    # Clear previous line completely
+                    print(' ' * last_print_len, end='\r')
+                    print(f"Receiving: {message_buffer}", end='\r')
+                    last_print_len = len(message_buffer) + 10
+
 
 def process_message(raw_message):
     print(' ' * 100, end='\r')
@@ -118,7 +186,7 @@ def process_message(raw_message):
             print(f"\nInvalid format: {clean} (got {len(payload)}/7 values)")
             return
         
-        recorded_at = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+        recorded_at = utc_timestamp()
 
         print(f"\n\n=== Sensor Data=======")
         print(f"device_id: {payload[0]}")
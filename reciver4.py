@@ -6,101 +6,171 @@ Updated AFSK Receiver - Adjusted parameters for more accurate decoding
 import numpy as np
 import pyaudio
 import time
-from scipy.signal import butter, lfilter
+import threading
+from scipy.signal import butter, sosfilt
 
 MARK_FREQ = 1200  # Hz (Binary 1)
 SPACE_FREQ = 2200  # Hz (Binary 0)
 BAUD_RATE = 300  # Baud rate
 SAMPLE_RATE = 44100  # Hz
 NOISE_THRESHOLD = 0.1  # Slightly increased to reduce false positives
-CHUNK = 4410  # 0.1 seconds of audio at 44.1kHz
+CHUNK = 4410  # 0.1 seconds of audio at 44.1kHz (a whole number of bits)
+DECIM = 7  # Decimation factor before the tone filters
+SR_DS = SAMPLE_RATE // DECIM  # 6300 Hz, exactly 21 samples per bit at 300 baud
+RING_CHUNKS = 32  # Chunks held between the audio callback and the decoder (~3 s)
 
 p = pyaudio.PyAudio()
 
-def bandpass_filter(data, center_freq, bandwidth=80):
-    """Apply a bandpass filter around the target frequency."""
-    nyquist = 0.5 * SAMPLE_RATE
+# Anti-alias lowpass for the decimator: passes both tones, stops well below
+# the new Nyquist (3150 Hz)
+SOS_AA = butter(8, 2800 / (0.5 * SAMPLE_RATE), btype='low', output='sos')
+
+def design_bandpass(center_freq, bandwidth=80):
+    """Design a bandpass filter around the target frequency, in SOS form."""
+    nyquist = 0.5 * SR_DS
     low = (center_freq - bandwidth / 2) / nyquist
     high = (center_freq + bandwidth / 2) / nyquist
-    b, a = butter(4, [low, high], btype='band')
-    return lfilter(b, a, data)
-
-def detect_signal(audio_buffer):
-    """Detect if a valid signal is present in the audio buffer."""
-    mark_filtered = bandpass_filter(audio_buffer, MARK_FREQ)
-    space_filtered = bandpass_filter(audio_buffer, SPACE_FREQ)
-    mark_energy = np.mean(mark_filtered ** 2)
-    space_energy = np.mean(space_filtered ** 2)
-    total_energy = mark_energy + space_energy
+    return butter(4, [low, high], btype='band', output='sos')
+
+# Filters are designed once here, not on every chunk
+SOS_MARK = design_bandpass(MARK_FREQ)
+SOS_SPACE = design_bandpass(SPACE_FREQ)
+
+SAMPLES_PER_BIT = int(SR_DS / BAUD_RATE)
+
+def new_filter_state():
+    """Zeroed state for the decimator and both tone filters."""
+    return {
+        'aa': np.zeros((SOS_AA.shape[0], 2)),
+        'mark': np.zeros((SOS_MARK.shape[0], 2)),
+        'space': np.zeros((SOS_SPACE.shape[0], 2)),
+    }
+
+def bit_energies(data, state):
+    """
+    Filter one chunk and return per-bit MARK and SPACE energies.
+    Filter state is carried over in `state`, so consecutive chunks behave
+    like one continuous signal with no edge transients.
+    """
+    ds, state['aa'] = sosfilt(SOS_AA, data, zi=state['aa'])
+    ds = ds[::DECIM]
+    mark_filtered, state['mark'] = sosfilt(SOS_MARK, ds, zi=state['mark'])
+    space_filtered, state['space'] = sosfilt(SOS_SPACE, ds, zi=state['space'])
+    num_bits = len(ds) // SAMPLES_PER_BIT
+    usable = num_bits * SAMPLES_PER_BIT
+    # Sum of squares per bit period; einsum fuses the multiply and the sum,
+    # so no squared copy of the signal is made
+    mark_bits = mark_filtered[:usable].reshape(num_bits, SAMPLES_PER_BIT)
+    space_bits = space_filtered[:usable].reshape(num_bits, SAMPLES_PER_BIT)
+    mark_energy = np.einsum('ij,ij->i', mark_bits, mark_bits)
+    space_energy = np.einsum('ij,ij->i', space_bits, space_bits)
+    return mark_energy, space_energy
+
+# Run the filter chain once at import so the first real chunk doesn't pay
+# for one-time setup
+bit_energies(np.zeros(CHUNK, dtype=np.float32), new_filter_state())
+
+def detect_signal(mark_energy, space_energy):
+    """Detect if a valid signal is present, given per-bit energies for a chunk."""
+    num_samples = len(mark_energy) * SAMPLES_PER_BIT
+    if num_samples == 0:
+        return False
+    total_energy = (mark_energy.sum() + space_energy.sum()) / num_samples
     return total_energy > NOISE_THRESHOLD
 
-def decode_afsk(audio_buffer):
-    """Decode AFSK signal to binary data"""
-    samples_per_bit = int(SAMPLE_RATE / BAUD_RATE)
-    mark_filtered = bandpass_filter(audio_buffer, MARK_FREQ)
-    space_filtered = bandpass_filter(audio_buffer, SPACE_FREQ)
-    num_bits = len(audio_buffer) // samples_per_bit
-    binary_data = ""
-    for i in range(num_bits):
-        start = i * samples_per_bit
-        end = start + samples_per_bit
-        mark_energy = np.sum(mark_filtered[start:end] ** 2)
-        space_energy = np.sum(space_filtered[start:end] ** 2)
-        binary_data += "1" if mark_energy > space_energy else "0"
-    return binary_data
+def decode_afsk(mark_energy, space_energy):
+    """Decode per-bit energies to a uint8 array of bits (1 = MARK)"""
+    return (mark_energy > space_energy).astype(np.uint8)
 
 def binary_to_text(binary_data):
-    """Convert binary string to text"""
+    """Convert an array of bits (MSB first) to text"""
     # Make sure length is multiple of 8
     binary_data = binary_data[:len(binary_data) - (len(binary_data) % 8)]
-    text = ""
-    for i in range(0, len(binary_data), 8):
-        byte = binary_data[i:i+8]
-        try:
-            text += chr(int(byte, 2))
-        except ValueError:
-            text += "?"
-    return text
-
-def process_audio(data, audio_buffer, in_signal, signal_start_time):
+    return np.packbits(binary_data).tobytes().decode('latin-1')
+
+def process_audio(data, state, energies, in_signal, signal_start_time):
     """Process incoming audio data for AFSK signals"""
-    if not in_signal and detect_signal(data):
+    mark_energy, space_energy = bit_energies(data, state)
+    present = detect_signal(mark_energy, space_energy)
+    if not in_signal and present:
         in_signal = True
         signal_start_time = time.time()
-        audio_buffer = []
+        energies = []
         print("Signal detected - receiving...")
     if in_signal:
-        audio_buffer.extend(data)
-        if not detect_signal(data):
+        # Keep per-bit energies only (30 values per chunk), not raw samples
+        energies.append((mark_energy, space_energy))
+        if not present:
             signal_duration = time.time() - signal_start_time
             if signal_duration >= 0.5:
                 print(f"Signal received: {signal_duration:.1f} seconds")
-                binary_data = decode_afsk(np.array(audio_buffer))
+                binary_data = decode_afsk(np.concatenate([m for m, _ in energies]),
+                                          np.concatenate([s for _, s in energies]))
                 print(f"Binary data length: {len(binary_data)} bits")
-                print(f"Binary: {binary_data}")
+                print(f"Binary: {(binary_data + ord('0')).tobytes().decode('ascii')}")
                 text = binary_to_text(binary_data)
                 print(f"Decoded message: {text}")
                 print("-" * 40)
             in_signal = False
-            audio_buffer = []
-    return audio_buffer, in_signal, signal_start_time
+            energies = []
+    return energies, in_signal, signal_start_time
 
 def receive_audio():
     """Main function to receive and process audio."""
-    audio_buffer = []
+    state = new_filter_state()
+    energies = []
     in_signal = False
     signal_start_time = 0
+    
+    # Ring between the audio callback and the processing loop. Positions are
+    # running sample counts; only the callback advances write_pos and only
+    # the loop below advances read_pos. The ring holds a whole number of
+    # chunks, so a chunk-sized callback never wraps and each chunk is read
+    # in place
+    ring = np.empty(RING_CHUNKS * CHUNK, dtype=np.float32)
+    write_pos = 0
+    read_pos = 0
+    data_ready = threading.Event()
+    
+    def audio_callback(in_data, frame_count, time_info, status):
+        nonlocal write_pos
+        raw = np.frombuffer(in_data, dtype=np.int16)
+        start = write_pos % len(ring)
+        first = min(len(raw), len(ring) - start)
+        # Cast and scale straight into the ring, wrapping at the end if needed
+        np.multiply(raw[:first], np.float32(1.0 / 32768.0), out=ring[start:start + first], casting='unsafe')
+        if first < len(raw):
+            np.multiply(raw[first:], np.float32(1.0 / 32768.0), out=ring[:len(raw) - first], casting='unsafe')
+        write_pos += len(raw)
+        data_ready.set()
+        return (None, pyaudio.paContinue)
+    
     stream = p.open(format=pyaudio.paInt16,
                     channels=1,
                     rate=SAMPLE_RATE,
                     input=True,
-                    frames_per_buffer=CHUNK)
+                    frames_per_buffer=CHUNK,
+                    stream_callback=audio_callback)
     print("Listening for AFSK signal...")
     print(f"MARK: {MARK_FREQ} Hz, SPACE: {SPACE_FREQ} Hz, RATE: {BAUD_RATE} baud")
     try:
         while True:
-            data = np.frombuffer(stream.read(CHUNK), dtype=np.int16).astype(np.float32) / 32768.0
-            audio_buffer, in_signal, signal_start_time = process_audio(data, audio_buffer, in_signal, signal_start_time)
+            data_ready.wait(timeout=0.5)
+            data_ready.clear()
+            
+            if write_pos - read_pos > len(ring):
+                print("Warning: processing fell behind, audio dropped")
+                read_pos = write_pos - len(ring)
+            
+            while write_pos - read_pos >= CHUNK:
+                start = read_pos % len(ring)
+                end = start + CHUNK
+                if end <= len(ring):
+                    samples = ring[start:end]
+                else:
+                    samples = np.concatenate((ring[start:], ring[:end - len(ring)]))
+                energies, in_signal, signal_start_time = process_audio(samples, state, energies, in_signal, signal_start_time)
+                read_pos += CHUNK
     except KeyboardInterrupt:
         print("\nStopping...")
     finally:
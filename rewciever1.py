@@ -20,7 +20,7 @@ dot_duration = 0.1
 q = queue.Queue()
 
 def audio_callback(indata, frames, time, status):
-    q.put(indata.copy())
+    q.put(indata[:, 0].copy())  # mono samples, already 1-D
 
 def listen_and_decode():
     current_symbol = ''
@@ -32,8 +32,8 @@ def listen_and_decode():
         print("Listening for Morse code...")
         while True:
             try:
-                data = q.get_nowait().flatten()
-                rms = np.sqrt(np.mean(np.square(data)))
+                data = q.get(timeout=0.1)
+                rms = np.sqrt(np.dot(data, data) / data.size)
                 
                 if rms > threshold and not in_signal:
                     # Signal started
@@ -66,7 +66,7 @@ def listen_and_decode():
                         print(f"\rCurrent message: {message}", end='')
 
             except queue.Empty:
-                time.sleep(0.01)
+                continue  # Woken by the next block, no fixed poll
 
 if __name__ == "__main__":
     listen_and_decode()
\ No newline at end of file
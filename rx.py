@@ -45,8 +45,8 @@ def listen():
         
         while True:
             try:
-                data = q.get_nowait().flatten()
-                rms = np.sqrt(np.mean(data**2))
+                data = q.get(timeout=0.1).flatten()
+                rms = np.sqrt(np.dot(data, data) / data.size)
                 now = time.time()
                 
                 if rms > threshold:
@@ -84,7 +84,7 @@ def listen():
                         current_symbol = ''
                 
             except queue.Empty:
-                time.sleep(0.01)
+                continue  # Woken by the next block, no fixed poll
             except KeyboardInterrupt:
                 return
 
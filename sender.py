@@ -3,8 +3,7 @@ import datetime
 import os
 import random
 import time
-import numpy as np
-import sounddevice as sd
+from combinedsender import MorseSender
 
 PROGRESS_FILE = "progress.json"
 PREVIOUS_READINGS_FILE = "previous_readings.json"
@@ -32,31 +31,7 @@ MORSE_CODE_DICT = {
 FREQUENCY = 600
 dot_duration = 0.1
 
-def text_to_morse(text):
-    return ' '.join(MORSE_CODE_DICT.get(i, '') for i in text)
-
-def generate_tone(duration):
-    t = np.linspace(0, duration, int(44100 * duration), False)
-    return 0.5 * np.sin(2 * np.pi * FREQUENCY * t)
-
-def play_morse(morse_code):
-    primer = '... / '
-    morse_code = primer + morse_code + ' /'
-    
-    for symbol in morse_code:
-        if symbol == '.':
-            sd.play(generate_tone(dot_duration), samplerate=44100)
-            sd.wait()
-            time.sleep(dot_duration)  # Inter-symbol space
-        elif symbol == '-':
-            sd.play(generate_tone(3*dot_duration), samplerate=44100)
-            sd.wait()
-            time.sleep(dot_duration)  # Inter-symbol space
-        elif symbol == ' ':
-            time.sleep(3*dot_duration)  # Inter-character space
-        elif symbol == '/':
-            time.sleep(7*dot_duration)  # Inter-word space
-
+morse_sender = MorseSender(dot_duration, FREQUENCY, MORSE_CODE_DICT)
 
 def load_previous_readings():
     if os.path.exists(PREVIOUS_READINGS_FILE):
@@ -156,7 +131,7 @@ def handle_reading(timestamp, device_id, previous_readings):
     message = ' '.join(values)
     
     print(f"Transmitting: {message}")
-    play_morse(text_to_morse(message))
+    morse_sender.play(morse_sender.text_to_morse(message))
 
 def main():
     last_timestamp = load_progress()
@@ -18,44 +18,48 @@ AMPLITUDE = 0.95  # High amplitude for reliable transmission
 p = pyaudio.PyAudio()
 
 def text_to_binary(text):
-    """Convert text to binary string"""
-    return ''.join(format(ord(c), '08b') for c in text)
+    """Convert text to a uint8 array of bits, MSB first"""
+    return np.unpackbits(np.frombuffer(text.encode('latin-1', errors='replace'), dtype=np.uint8))
 
-def generate_sync_pattern():
-    """Generate sync pattern after VOX preamble"""
+def sync_pattern_bits():
+    """Bits of the sync pattern sent after the VOX preamble"""
     duration = 1.0  # Sync pattern duration
-    bit_samples = int(SAMPLE_RATE / BAUD_RATE)
     total_bits = int(duration * BAUD_RATE)
-    signal = np.zeros(total_bits * bit_samples, dtype=np.float32)
-    for i in range(total_bits):
-        freq = MARK_FREQ if i % 2 == 0 else SPACE_FREQ
-        t = np.arange(bit_samples) / SAMPLE_RATE
-        start = i * bit_samples
-        signal[start:start+bit_samples] = AMPLITUDE * np.sin(2 * np.pi * freq * t)
-    return signal
+    # Alternating MARK/SPACE, starting with MARK
+    return ((np.arange(total_bits) + 1) % 2).astype(np.uint8)
+
+SYNC_BITS = sync_pattern_bits()
 
 def generate_afsk(binary_data):
-    """Generate AFSK audio signal from binary data"""
+    """Generate AFSK audio signal from an array of bits"""
     samples_per_bit = int(SAMPLE_RATE / BAUD_RATE)
-    signal = np.zeros(len(binary_data) * samples_per_bit, dtype=np.float32)
-    for i, bit in enumerate(binary_data):
-        freq = MARK_FREQ if bit == '1' else SPACE_FREQ
-        t = np.arange(samples_per_bit) / SAMPLE_RATE
-        bit_signal = AMPLITUDE * np.sin(2 * np.pi * freq * t)
-        start = i * samples_per_bit
-        signal[start:start+samples_per_bit] = bit_signal
-    return signal
+    # Phase step per sample for each bit, and the continuous phase each bit
+    # starts at; only that running sum needs float64, wrapped to [0, 2*pi)
+    step = np.where(binary_data, 2 * np.pi * MARK_FREQ / SAMPLE_RATE, 2 * np.pi * SPACE_FREQ / SAMPLE_RATE)
+    start = np.cumsum(step * samples_per_bit) - step * samples_per_bit
+    start %= 2 * np.pi
+    
+    # Fill one preallocated float32 buffer, a row per bit, in place
+    out = np.empty((len(step), samples_per_bit), dtype=np.float32)
+    np.multiply.outer(step.astype(np.float32), np.arange(samples_per_bit, dtype=np.float32), out=out)
+    out += start.astype(np.float32)[:, None]
+    np.sin(out, out=out)
+    out *= np.float32(AMPLITUDE)
+    return out.reshape(-1)
+
+def to_pcm16(signal):
+    """Convert a float signal in [-1, 1] to 16-bit PCM bytes"""
+    return (signal * 32767).astype(np.int16).tobytes()
 
 def transmit(message, repeat=1, delay=2):
     """Transmit a message using AFSK without VOX"""
     binary_data = text_to_binary(message)
     print(f"Message: {message}")
-    print(f"Binary: {binary_data}")
+    print(f"Binary: {(binary_data + ord('0')).tobytes().decode('ascii')}")
     print(f"Length: {len(binary_data)} bits")
-    sync_pattern = generate_sync_pattern()
-    data_signal = generate_afsk(binary_data)
-    signal = np.concatenate([sync_pattern, data_signal])
-    audio_data = (signal * 32767).astype(np.int16)
+    # Sync and data are rendered as one bit stream, so the tone phase runs
+    # on unbroken through every bit boundary, including sync -> data
+    audio_data = to_pcm16(generate_afsk(np.concatenate((SYNC_BITS, binary_data))))
     stream = p.open(format=pyaudio.paInt16,
                     channels=1,
                     rate=SAMPLE_RATE,
@@ -65,7 +69,7 @@ def transmit(message, repeat=1, delay=2):
             print(f"Repeat {i+1}/{repeat} - Waiting {delay} seconds...")
             time.sleep(delay)
         print(f"Transmitting... ({i+1}/{repeat})")
-        stream.write(audio_data.tobytes())
+        stream.write(audio_data)
         print("Transmission complete!")
     stream.stop_stream()
     stream.close()
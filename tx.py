@@ -26,8 +26,12 @@ inter_char_pause = 3 * dot_duration  # Between characters
 word_pause = 1.0  # Between words (not used)
 
 def generate_tone(duration):
-    t = np.linspace(0, duration, int(44100 * duration), False)
-    return 0.5 * np.sin(2 * np.pi * frequency * t)
+    # float32 and in place: one buffer, no float64 temporaries
+    t = np.arange(int(44100 * duration), dtype=np.float32)
+    t *= np.float32(2 * np.pi * frequency / 44100)
+    np.sin(t, out=t)
+    t *= np.float32(0.5)
+    return t
 
 def play_morse(code):
     for symbol in code:
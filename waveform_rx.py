@@ -4,7 +4,6 @@ Simple Waveform Receiver - Records and visualizes audio signals
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 import pyaudio
 import time
 import argparse
@@ -19,12 +18,15 @@ CHUNK_SIZE = 1024
 MAX_RECORD_SECONDS = 30  # Maximum recording time
 
 class SimpleWaveformReceiver:
-    def __init__(self):
+    def __init__(self, plot=True):
         self.sample_rate = SAMPLE_RATE
         self.chunk_size = CHUNK_SIZE
+        self.plot = plot  # Show plots after analysis (matplotlib is only imported if so)
         
-        # For recording
-        self.recording = []
+        # For recording: one buffer for the longest allowed recording,
+        # filled in place by the audio callback
+        self.recording = np.empty(SAMPLE_RATE * MAX_RECORD_SECONDS, dtype=np.float32)
+        self.recording_length = 0
         self.is_recording = False
         self.recording_start_time = None
         
@@ -94,7 +96,7 @@ class SimpleWaveformReceiver:
         audio_data = np.frombuffer(in_data, dtype=np.float32)
         
         # Calculate RMS level
-        rms = np.sqrt(np.mean(audio_data**2))
+        rms = np.sqrt(np.dot(audio_data, audio_data) / audio_data.size)
         
         # Keep last data point for visualization
         self.plot_data.append((time.time(), audio_data.copy(), rms))
@@ -103,10 +105,13 @@ class SimpleWaveformReceiver:
         
         # Add to recording if active
         if self.is_recording:
-            self.recording.extend(audio_data)
+            start = self.recording_length
+            end = min(start + len(audio_data), len(self.recording))
+            self.recording[start:end] = audio_data[:end - start]
+            self.recording_length = end
             
-            # Check if recording time exceeded
-            if (time.time() - self.recording_start_time) > MAX_RECORD_SECONDS:
+            # Check if recording time exceeded (or the buffer is full)
+            if (time.time() - self.recording_start_time) > MAX_RECORD_SECONDS or end == len(self.recording):
                 print(f"Maximum recording time ({MAX_RECORD_SECONDS}s) reached.")
                 self.stop_recording()
         
@@ -118,7 +123,7 @@ class SimpleWaveformReceiver:
             print("Already recording!")
             return
         
-        self.recording = []
+        self.recording_length = 0
         self.is_recording = True
         self.recording_start_time = time.time()
         
@@ -140,12 +145,12 @@ class SimpleWaveformReceiver:
         self.is_recording = False
         duration = time.time() - self.recording_start_time
         
-        if not self.recording:
+        if not self.recording_length:
             print("No recording data captured!")
             return None
         
-        # Convert to numpy array
-        recording_array = np.array(self.recording)
+        # Copy out, since the buffer is reused by the next recording
+        recording_array = self.recording[:self.recording_length].copy()
         
         # Create output directory if it doesn't exist
         os.makedirs("recordings", exist_ok=True)
@@ -174,6 +179,27 @@ class SimpleWaveformReceiver:
             return
         
         duration = len(recording_data) / self.sample_rate
+        f, pxx = signal.welch(recording_data, self.sample_rate, nperseg=1024)
+        
+        if self.plot:
+            self.plot_recording(recording_data, duration, f, pxx)
+        
+        # Display summary info
+        print("\nSignal Analysis:")
+        print(f"Duration: {duration:.2f} seconds")
+        print(f"Peak amplitude: {np.max(np.abs(recording_data)):.4f}")
+        print(f"RMS level: {np.sqrt(np.dot(recording_data, recording_data) / recording_data.size):.4f}")
+        
+        # Find dominant frequencies
+        peak_indices = signal.find_peaks(pxx, height=np.max(pxx)/10)[0]
+        peak_freqs = f[peak_indices]
+        if len(peak_freqs) > 0:
+            print(f"Dominant frequencies: {peak_freqs[0:5]} Hz")
+    
+    def plot_recording(self, recording_data, duration, f, pxx):
+        """Plot waveform, power spectrum and spectrogram of a recording"""
+        # Imported here so capture and --no-plot runs never load matplotlib
+        import matplotlib.pyplot as plt
         
         # Create the plot
         plt.figure(figsize=(10, 8))
@@ -189,7 +215,6 @@ class SimpleWaveformReceiver:
         
         # Frequency domain plot
         plt.subplot(3, 1, 2)
-        f, pxx = signal.welch(recording_data, self.sample_rate, nperseg=1024)
         plt.semilogy(f, pxx)
         plt.title("Power Spectrum")
         plt.xlabel("Frequency (Hz)")
@@ -211,18 +236,6 @@ class SimpleWaveformReceiver:
         
         plt.tight_layout()
         plt.show()
-        
-        # Display summary info
-        print("\nSignal Analysis:")
-        print(f"Duration: {duration:.2f} seconds")
-        print(f"Peak amplitude: {np.max(np.abs(recording_data)):.4f}")
-        print(f"RMS level: {np.sqrt(np.mean(recording_data**2)):.4f}")
-        
-        # Find dominant frequencies
-        peak_indices = signal.find_peaks(pxx, height=np.max(pxx)/10)[0]
-        peak_freqs = f[peak_indices]
-        if len(peak_freqs) > 0:
-            print(f"Dominant frequencies: {peak_freqs[0:5]} Hz")
     
     def analyze_file(self, filename):
         """Analyze a previously recorded signal file"""
@@ -333,10 +346,12 @@ def main():
     parser.add_argument("-a", "--analyze", type=str, help="Analyze a saved recording file")
     parser.add_argument("-r", "--record", type=float, default=0, 
                        help="Record for specified duration in seconds (0 for manual control)")
+    parser.add_argument("--no-plot", action="store_true",
+                       help="Print the analysis summary without plotting")
     
     args = parser.parse_args()
     
-    receiver = SimpleWaveformReceiver()
+    receiver = SimpleWaveformReceiver(plot=not args.no_plot)
     
     # Analyze a file if specified
     if args.analyze: